@@ -0,0 +1,146 @@
+"""
+Asset bundle - every image and dictionary of the games packed in one file.
+Description: The images are stored decoded, as raw BGRA pixels (the pixel
+format of the display's surfaces), and the dictionaries as they are, after
+an index of the assets. The game maps the bundle in memory and creates its
+surfaces straight from the mapped pixels: starting it needs no PNG decoding
+and no other file. The index keeps the size and the modification time of
+every file packed: while editing the assets, set ASSET_BUNDLE_CHECK=1 and
+the files changed since the bundle was built are loaded instead of it.
+
+Usage: python asset_bundle.py (again after changing an image or a dictionary)
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import struct
+
+import pygame
+
+BUNDLE = 'assets.bundle' # name of the bundle, next to the game
+MAGIC = b'MGBUNDLE'
+# Changing the layout of the bundle must change this number so the bundles
+# built by older versions are ignored
+VERSION = 2
+ALIGN = 16 # every asset starts at a multiple of ALIGN bytes
+HEADER = struct.Struct('<8sII') # magic, version, length of the index
+# Comparing every asset with its file costs a stat per file at each launch,
+# only done when asked for (while editing the assets)
+CHECK = os.environ.get('ASSET_BUNDLE_CHECK') == '1'
+
+def aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+# Reads a bundle: the file is mapped in memory once and the assets are views
+# of the mapped file. The mapping is copy on write, nothing is copied until
+# something changes an asset and the file itself never changes
+class Bundle:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        magic, version, length = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{path} is not a bundle of version {VERSION}, build it again')
+        self.index = json.loads(self.map[HEADER.size:HEADER.size + length])
+        self.directory = os.path.dirname(os.path.abspath(path)) # the sources are relative to it
+        self.start = aligned(HEADER.size + length) # where the first asset starts
+        self.view = memoryview(self.map)
+
+    @classmethod
+    def open(cls, path):
+        """ Returns the bundle or None if there is no valid bundle at path,
+        the game then loads the loose files. """
+        try:
+            return cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def current(self, name):
+        """ Returns True if the asset can be used: the file it was packed
+        from has not changed since, is gone, or CHECK is off. Otherwise the
+        file must be used. """
+        if not CHECK:
+            return True
+        entry = self.index[name]
+        try:
+            stat = os.stat(os.path.join(self.directory, entry['source']))
+        except OSError:
+            return True
+        return stat.st_size == entry['bytes'] and stat.st_mtime_ns == entry['mtime']
+
+    def names(self, kind):
+        """ Returns the names of the assets of a kind ('image' or 'text'). """
+        return [name for name, entry in self.index.items() if entry['kind'] == kind]
+
+    def data(self, name):
+        """ Returns a view of the bytes of an asset in the mapped file. """
+        entry = self.index[name]
+        start = self.start + entry['offset']
+        return self.view[start:start + entry['length']]
+
+    def image(self, name):
+        """ Returns a surface using the pixels of the mapped file. """
+        return pygame.image.frombuffer(self.data(name), tuple(self.index[name]['size']), 'BGRA')
+
+    def read(self, name):
+        """ Returns the content of a text asset as bytes. """
+        return bytes(self.data(name))
+
+def build(directory, output=None):
+    """ Packs images/*.png and the dictionaries (*dico*.txt) of the directory
+    in one bundle. Returns the path of the bundle and the number of assets. """
+    output = output or os.path.join(directory, BUNDLE)
+
+    def source(path):
+        """ Returns what the index keeps about the file of an asset. """
+        stat = os.stat(path)
+        return {'source': os.path.relpath(path, os.path.dirname(os.path.abspath(output))),
+                'bytes': stat.st_size, 'mtime': stat.st_mtime_ns}
+
+    assets = [] # (name, entry of the index, bytes)
+    for path in sorted(glob.glob(os.path.join(glob.escape(directory), 'images', '*.png'))):
+        image = pygame.image.load(path)
+        assets.append((os.path.basename(path), dict(source(path), kind='image', size=image.get_size()),
+                       pygame.image.tobytes(image, 'BGRA')))
+    for path in sorted(glob.glob(os.path.join(glob.escape(directory), '*dico*.txt'))):
+        with open(path, 'rb') as file:
+            assets.append((os.path.basename(path), dict(source(path), kind='text'), file.read()))
+
+    index = {}
+    offset = 0
+    for name, entry, data in assets:
+        offset = aligned(offset)
+        index[name] = dict(entry, offset=offset, length=len(data))
+        offset += len(data)
+    index = json.dumps(index).encode('utf-8')
+
+    # Written to a temporary file first so a game starting meanwhile never
+    # maps half a bundle
+    temporary = f'{output}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(index)))
+        file.write(index)
+        start = aligned(HEADER.size + len(index))
+        for name, entry, data in assets:
+            file.write(b'\0' * (start + aligned(file.tell() - start) - file.tell()))
+            file.write(data)
+    os.replace(temporary, output)
+    return output, len(assets)
+
+def main():
+    parser = argparse.ArgumentParser(description='Packs the images and the dictionaries of the games in one file.')
+    parser.add_argument('--directory', default=os.path.dirname(os.path.abspath(__file__)), help='folder of the game')
+    parser.add_argument('--output', default=None, help=f'path of the bundle (default: {BUNDLE} in the folder)')
+    args = parser.parse_args()
+
+    output, count = build(args.directory, args.output)
+    print(f'{count} assets packed in {output} ({os.path.getsize(output) / 1024:.0f} KB)')
+
+if __name__ == '__main__':
+    main()
@@ -4,16 +4,26 @@ Description: Mini games built with Python and Pygame zero.
 Authors: Maïmouna N'Diaye & Leonore Ndebele
 """
 
+import time
 from random import randint
-import pgzrun
-from pgzero.actor import Actor
+from functools import partial
+from concurrent.futures import Future
+from queue import PriorityQueue
+import threading
 import os, sys
-from collections import Counter
+import numpy as np
+import pygame
 from pygame import Rect
+from wordle_engine import Lexicon, FeedbackTable, HintEngine, Typing, WORD_LENGTH
+from snake_engine import SnakeWorld, GreedyBot, DIRECTIONS, HEAD_ANGLES, headings
+from number_engine import ListOfNumbers, NumberSampler, WinOdds, LEVELS
+from asset_bundle import Bundle, BUNDLE
 
-# dico_path = os.path.dirname(sys.argv[0])
-dico_path = "/home/mn/EPITA/Design Patterns/Final_Project"
-os.chdir(dico_path)
+started = time.perf_counter() # for the time to the first frame, after the imports
+
+# Folder of the game, the images and the dictionaries are found from there
+# whatever the current directory is
+dico_path = os.path.dirname(os.path.abspath(__file__))
 
 # Game factory to create the different types of games
 class GameFactory:
@@ -29,30 +39,56 @@ class GameFactory:
         else:
             raise ValueError('Invalid Game Type')
 
+# Keeps a copy of the screens that do not move once they are drawn, so the
+# next frames only blit the copy instead of drawing everything again
+class ScreenCache:
+    def __init__(self):
+        self.content = {} # name of the screen: (key, surface)
+
+    def draw(self, name, key, draw):
+        """ Blits the copy of the screen if it was drawn with the same key,
+        otherwise calls draw() and keeps a copy of the result. The key holds
+        everything the screen depends on (a score, a word...). """
+        key = (key, screen.surface.get_size())
+        if name in self.content and self.content[name][0] == key:
+            screen.blit(self.content[name][1], (0, 0))
+        else:
+            draw()
+            self.content[name] = (key, screen.surface.copy())
+
+    def clear(self):
+        self.content = {}
+
 # Managing the different screens through a ScreenDraw class
 # using State pattern
 class ScreenDraw:
     def __init__(self, game):
         self.state = 'Game Menu' # Default state
         self.game = game # The game object
+        self.screen_cache = ScreenCache() # Copies of the static screens
 
     def execute(self):
         """ Executes the draw funtion depending on the state and the
-            game chosen. """
+            game chosen. The game menu, win and lose screens are static
+            so they are only drawn again when their key changes. """
         if self.state == 'Main Menu':
             self.game = None
         elif self.state == 'Game Menu':
-            self.draw_game_menu()
+            self.screen_cache.draw(self.state, self.cache_key(), self.draw_game_menu)
         elif self.state == 'Play Screen':
             self.draw_play_screen()
         elif self.state == 'Lose':
-            self.draw_lose_screen()
+            self.screen_cache.draw(self.state, self.cache_key(), self.draw_lose_screen)
         elif self.state == 'Win':
-            self.draw_win_screen()       
+            self.screen_cache.draw(self.state, self.cache_key(), self.draw_win_screen)
 
     def center_pos(self, obj):
         """ Returns the right x position to center a button"""
         return (800 - obj.width)//2
+
+    def cache_key(self):
+        """ Returns what the static screen of the current state depends on. """
+        return None
     
     def draw_main_menu(self):
         pass
@@ -74,6 +110,7 @@ class NumberChallengeDraw(ScreenDraw):
     def __init__(self, game):
         self.state = 'Game Menu'
         self.game = game
+        self.screen_cache = ScreenCache()
 
     def draw_game_menu(self):
         screen.clear()
@@ -101,26 +138,28 @@ class NumberChallengeDraw(ScreenDraw):
         for i in self.game.cubes:
             i.draw()
         
-        # Positioning the number next to the cube accordingly
-        for i in range(len(self.game.cubes.content)):
-            if i < 9:
-                x = 50
-            elif i == 9:
-                x = 50
-            elif i < 20 and i > 9:
-                x = 200
-            else:
-                x = 350
-            screen.draw.text(f'{i + 1}', (x - 15, self.game.cubes[i].y - 10), color=('#000000'), fontsize=30)
-         
-        # Drawing each cube with the "number assigned to it"
-        for i in range(1, self.game.list_of_numbers.number_of_slots + 1):
-            screen.draw.text(f'{self.game.list_of_numbers[i]}', (self.game.cubes[i - 1].x + 35, self.game.cubes[i - 1].y - 10), color=('#ffffff'), fontsize=40)
+        # Writting the slot of each cube on it and the number assigned to it
+        # next to it, the positions come from the layout of the level
+        for slot, (cube, index, value, odds) in enumerate(self.game.cubes.layout, 1):
+            screen.draw.text(f'{slot}', index, color=('#000000'), fontsize=30)
+            screen.draw.text(f'{self.game.list_of_numbers[slot]}', value, color=('#ffffff'), fontsize=40)
         
         # Drawing the number
         screen.draw.text(str(self.game.current_number), (280,60), color=(255,255,255), fontsize=65)
         screen.draw.text('Press Escape to go back to the Game Menu', centerx=300, centery=750, color=(255,255,255), fontsize=30)
 
+        # Odds of winning next to each slot where the number can go, in
+        # place of the number the slot would show
+        if self.game.show_odds:
+            if self.game.odds.done():
+                for slot, odds in self.game.odds.result().items():
+                    position = self.game.cubes.layout[slot - 1][3]
+                    screen.draw.text(f'{odds * 100:.3g}%', position, color=('#EE51B1'), fontsize=25)
+            else:
+                screen.draw.text('Computing the odds...', centerx=300, centery=715, color=(255,255,255), fontsize=25)
+        else:
+            screen.draw.text('Press Tab to see the odds of winning of each slot', centerx=300, centery=715, color=(255,255,255), fontsize=25)
+
 
     def draw_win_screen(self):
         screen.clear()
@@ -145,6 +184,13 @@ class NumberChallengeDraw(ScreenDraw):
         screen.draw.text('Press Escape to go back to the Game Menu', centerx=300, centery=750, color=(255,255,255), fontsize=30)
 
 class WordleDraw(ScreenDraw):
+    def cache_key(self):
+        if self.state == 'Game Menu':
+            return self.game.length
+        # The win and lose screens show the last guess
+        typing = self.game.handle_typing
+        return (self.game.round, typing.word, tuple(typing.guess[self.game.round - 1]))
+
     def draw_game_menu(self):
         # Colored squares to explain the game
         green_square = LetterContainer(30, 300, 'green')
@@ -162,6 +208,12 @@ class WordleDraw(ScreenDraw):
         grey_square.draw()
         screen.draw.text('The letter is not in the word', (110, 480), color=(255,255,255), fontsize=40)
                 
+        # Length of the words to guess
+        length = f'Words of {self.game.length} letters'
+        if len(self.game.lengths) > 1:
+            length += ' (Left / Right to change)'
+        screen.draw.text(length, centerx=300, centery=550, color=(255,255,255), fontsize=30)
+
         screen.draw.text('Click the start button or press Enter to Start', centerx=300, centery=600, color=(255,255,255), fontsize=25)
         self.game.start_button.draw()
         screen.draw.text('START', (self.game.start_button.x - 75, self.game.start_button.y - 20), color=('#ffffff'), fontsize=65)
@@ -171,6 +223,7 @@ class WordleDraw(ScreenDraw):
         screen.clear()
         screen.fill('#FDD495')
         screen.draw.text('Type your guess and press enter to validate', centerx=300, centery=75, color=(255,255,255), fontsize=30)
+        screen.draw.text('Press Tab for a hint', centerx=300, centery=115, color=(255,255,255), fontsize=25)
         screen.draw.text('Press Escape to go back to the Game Menu', centerx=300, centery=750, color=(255,255,255), fontsize=25)
         
         # Drawing the squares where the letters go
@@ -186,7 +239,19 @@ class WordleDraw(ScreenDraw):
         # Writting the letters in the squares
         for round in range(self.game.round + 1):
             for letter, num in zip(self.game.handle_typing.guess[round], range(len(self.game.handle_typing.guess[round]))):
-                screen.draw.text(letter.upper(), (90 + num * 90, 165 + round * 90), color=(255,255,255), fontsize=80)   
+                screen.draw.text(letter.upper(), self.game.letter_position(round, num), color=(255,255,255), fontsize=self.game.font_size)   
+
+        # Number of words that are still possible
+        candidates = len(self.game.handle_typing.candidates)
+        screen.draw.text(f'{candidates} possible word{"s" if candidates > 1 else ""}', centerx=300, centery=690, color=(255,255,255), fontsize=30)
+
+        # Showing the hint for the current round once it has been computed
+        if self.game.hint is not None and self.game.hint_round == self.game.round:
+            if self.game.hint.done():
+                hint = 'Try ' + ', '.join(self.game.hint.result()).upper()
+            else:
+                hint = 'Looking for a hint...'
+            screen.draw.text(hint, centerx=300, centery=720, color=(255,255,255), fontsize=30)
              
     def draw_win_screen(self):
         screen.clear()
@@ -204,7 +269,7 @@ class WordleDraw(ScreenDraw):
         
         # Drawing the letters of the winning line
         for letter, num in zip(self.game.handle_typing.guess[self.game.round - 1], range(len(self.game.handle_typing.guess[self.game.round -1]))):
-            screen.draw.text(letter.upper(), (90 + num * 90, 400), color=(255,255,255), fontsize=80)   
+            screen.draw.text(letter.upper(), (self.game.letter_position(0, num)[0], 400), color=(255,255,255), fontsize=self.game.font_size)   
             
     def draw_lose_screen(self):
         screen.clear()
@@ -226,16 +291,28 @@ class WordleDraw(ScreenDraw):
         
         # Displaying the letters at the correct positions
         for letter, num in zip(self.game.handle_typing.guess[self.game.round - 1], range(len(self.game.handle_typing.guess[self.game.round -1]))):
-            screen.draw.text(letter.upper(), (90 + num * 90, 460), color=(255,255,255), fontsize=80)   
+            screen.draw.text(letter.upper(), (self.game.letter_position(0, num)[0], 460), color=(255,255,255), fontsize=self.game.font_size)   
             
 class SnakeDraw(ScreenDraw):
+    def execute(self):
+        # The stress test's report only exists in the Snake game
+        if self.state == 'Stress Report':
+            self.screen_cache.draw(self.state, tuple(self.game.stress_results), self.draw_stress_report)
+        else:
+            super().execute()
+
+    def cache_key(self):
+        if self.state == 'Lose':
+            return self.game.world.score
+        return None
+
     def draw_game_menu(self):
         # Apple and bomb for game description
-        apple = Actor('apple.png', (65, 250))
-        bomb = Actor('bomb.png', (65, 360))
+        apple = actor('apple.png', (65, 250))
+        bomb = actor('bomb.png', (65, 360))
 
         screen.clear()
-        screen.blit('bg_image_snake.png', (0, 0)) # Background image
+        screen.surface.blit(self.background(), (0, 0)) # Background image
         screen.draw.text('Welcome to the \nSNAKE GAME ', centerx=300, centery=120, color=(255,255,255), fontsize=65)
         
         # Game description
@@ -248,25 +325,96 @@ class SnakeDraw(ScreenDraw):
         screen.draw.text('Click the start button or press Enter to Start', centerx=300, centery=600, color='#00001b', fontsize=25)
         self.game.start_button.draw()
         screen.draw.text('START', (self.game.start_button.x - 70, self.game.start_button.y - 20), color=('#ffffff'), fontsize=65)
+        screen.draw.text('Press S for the stress test', centerx=300, centery=710, color='#00001b', fontsize=25)
         screen.draw.text('Press Escape to go back to the Main Menu', centerx=300, centery=750, color=(255,255,255), fontsize=30)
 
-    def draw_play_screen(self):
-        def draw_snake(snake):
-            """ Draws the snake."""
-            # Drawing snake head - only the snake's head rotates           
-            self.game.player.rotated_image.draw()
-            # drawing the rest of the snake's body
-            for i in snake.content[1:]:
-                i.draw()
+    def background(self):
+        """ Returns the background image converted once to the display's pixel
+        format, so blitting it every frame needs no conversion. """
+        if not hasattr(self, 'background_layer'):
+            self.background_layer = Assets().get('bg_image_snake.png').convert()
+        return self.background_layer
+
+    def oriented_sprites(self):
+        """ Returns the images of the snake rotated once in every direction:
+        {name: [left, right, up, down]}. Turning only picks another image. """
+        if not hasattr(self, 'orientations'):
+            # Angle of the parts' images going left (the head's image looks up)
+            angles = {'left': 0, 'right': 180, 'up': -90, 'down': 90}
+            self.orientations = {}
+            assets = Assets()
+            for name in ('1st_body', 'mini_snake_tail'):
+                image = assets.get(name + '.png')
+                self.orientations[name] = [pygame.transform.rotate(image, angles[direction]) for direction in DIRECTIONS]
+            head = assets.get('mini_snake_head.png')
+            self.orientations['mini_snake_head'] = [pygame.transform.rotate(head, HEAD_ANGLES[direction]) for direction in DIRECTIONS]
+            # The body has its own images along each axis
+            body, body_v = assets.get('mini_snake_body.png'), assets.get('mini_snake_body_v.png')
+            self.orientations['mini_snake_body'] = [body, body, body_v, body_v]
+        return self.orientations
+
+    def camera(self):
+        """ Returns the top left corner of the part of the arena shown in the
+        window, following the head when the arena is larger than the window. """
+        world = self.game.world
+        x, y = world.player.head()
+        return (int(min(max(x - WIDTH // 2, 0), world.width - WIDTH)),
+                int(min(max(y - HEIGHT // 2, 0), world.height - HEIGHT)))
+
+    def sprite_layer(self, camera):
+        """ Returns the (image, position) pairs of the snake and the items in
+        the window, to draw them all in a single blits call. """
+        world = self.game.world
+        snake = world.player
+        positions = snake.positions
+        # Drawing the snake between its previous and its current position
+        # depending on how far the game is into the next step. Parts added
+        # or removed since the last move have no previous position
+        if snake.previous is not None and len(snake.previous) == len(positions) and self.game.alpha != 1:
+            positions = snake.previous + (positions - snake.previous) * self.game.alpha
+
+        # Every part is drawn in the direction it is going
+        sprites = self.oriented_sprites()
+        directions = list(DIRECTIONS)
+        heading = [directions.index(snake.direction)] + headings(positions).tolist()
+        body = sprites['mini_snake_body']
+        # Top left corner of every part, all the parts are 50x50 pixels
+        corners = np.rint(positions - 25 - camera).astype(int).tolist()
+        layer = [(sprites['mini_snake_head'][heading[0]], corners[0])]
+        if len(corners) > 2:
+            layer.append((sprites['1st_body'][heading[1]], corners[1]))
+        layer.extend((body[i], corner) for i, corner in zip(heading[2:-1], corners[2:-1]))
+        layer.append((sprites['mini_snake_tail'][heading[-1]], corners[-1]))
+        # Only the items in the window, found with the spatial hash
+        left, top = camera
+        assets = Assets()
+        for name in world.items.query(Rect(left, top, WIDTH, HEIGHT)):
+            rect = world.items.rects[name]
+            layer.append((assets.get(name[0] + '.png'), (rect.x - left, rect.y - top)))
+        return layer
+
+    def hud_layer(self):
+        """ Returns the score as an image, rendered again only when the score
+        changes. """
+        score = self.game.world.score
+        if getattr(self, 'hud', (None,))[0] != score:
+            self.hud = (score, ptext.getsurf('Score: ' + str(score), color=(255,255,255), fontsize=65))
+        return self.hud[1]
 
-        screen.clear()
-        screen.blit('bg_image_snake.png', (0, 0)) # Background image
-        
-        # Drawing the snake, the apple, the bomb and the score
-        draw_snake(self.game.player)
-        self.game.apple.draw()
-        self.game.bomb.draw()
-        screen.draw.text('Score: ' + str(self.game.score), (20,10), color=(255,255,255), fontsize=65)
+    def draw_play_screen(self):
+        # Background layer, snake and items layer, then the score on top.
+        # The background is repeated in arenas larger than the window
+        camera = self.camera()
+        background = self.background()
+        for x in range(-(camera[0] % WIDTH), WIDTH, WIDTH):
+            for y in range(-(camera[1] % HEIGHT), HEIGHT, HEIGHT):
+                screen.surface.blit(background, (x, y))
+        screen.surface.blits(self.sprite_layer(camera), doreturn=False)
+        screen.surface.blit(self.hud_layer(), (20, 10))
+
+        if self.game.stress_level is not None:
+            entities = Snake.stress_levels[self.game.stress_level]
+            screen.draw.text(f'Stress test: {entities} apples and bombs', (20, 70), color=(255,255,255), fontsize=30)
 
         if not self.game.begin:
             screen.draw.text('Press any key to start', centerx=300, centery=400, color=(255,255,255), fontsize=80)
@@ -274,11 +422,20 @@ class SnakeDraw(ScreenDraw):
     def draw_win_screen(self): # Empty you can't win
         pass
 
+    def draw_stress_report(self):
+        screen.clear()
+        screen.surface.blit(self.background(), (0, 0)) # Background image
+        screen.draw.text('Stress test', centerx=300, centery=100, color=(255,255,255), fontsize=65)
+        for i, row in enumerate(self.game.stress_report()):
+            for j, cell in enumerate(row):
+                screen.draw.text(cell, topright=(130 + 110 * j, 180 + 40 * i), color=(255,255,255), fontsize=25)
+        screen.draw.text('Press Escape to go back to the Game Menu', centerx=300, centery=750, color=(255,255,255), fontsize=30)
+
     def draw_lose_screen(self):
         screen.clear()
-        screen.blit('bg_image_snake.png', (0, 0)) # Background image
+        screen.surface.blit(self.background(), (0, 0)) # Background image
         screen.draw.text('You Lost ! ! ! ', (200, 150), color=(255,255,255), fontsize=65)
-        screen.draw.text(f'SCORE: {self.game.score}', (50, 230), color=(255,255,255), fontsize=65)
+        screen.draw.text(f'SCORE: {self.game.world.score}', (50, 230), color=(255,255,255), fontsize=65)
 
         # Drawing replay button
         self.game.replay_button.draw()
@@ -289,7 +446,7 @@ class SnakeDraw(ScreenDraw):
 class Game:
     _instance = None
 
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
@@ -297,14 +454,23 @@ class Game:
     def __init__(self):
         self.type = None # Game type
         self.drawer = None # Asscociated drawer object
+        self.buttons = {} # name: Actor
         
+    def button(self, name, image, pos):
+        """ Returns the button called name. Like the icons, the buttons are
+        only created the first time they are drawn or clicked, so the rules
+        of a game work without a screen. """
+        if name not in self.buttons:
+            self.buttons[name] = actor(image, pos)
+        return self.buttons[name]
+
     def on_key_down(self):
         pass
 
     def on_mouse_down(self, pos):
         pass
 
-    def update(self):
+    def update(self, dt):
         pass
 
     def draw(self):
@@ -313,21 +479,14 @@ class Game:
 class NumberChallenge(Game):
     # Storing game levels and their associated number challenge
     # in a dictionary
-    levels = {i:j for i,j in zip(range(1,6), range(5, 26, 5))}
+    levels = LEVELS
+    min = 0 # Smallest number generated
     max = 999 # Biggest number generated
     # Different colors for cubes
     cube_types = ['blue_cube1.png', 'pink_cube1.png', 'purple_cube1.png']
-    # replay_button
-    replay_button = Actor('number_button.png', (265, 450))
-    
-    # Creating a level button for each level
-    #  and keeping them in a list
-    level_buttons = []
-    for i in range(5):
-        level_buttons.append(Actor('number_button.png', (130, 335 + i * 70)))
-    
-    def __init__(self):
+    def __init__(self, seed=None):
         self.type = 'Number Challenge'
+        self.buttons = {}
         # Game Variables with their default values 
         self.lose = False
         self.win = False
@@ -336,6 +495,15 @@ class NumberChallenge(Game):
         self.cubes = None
         self.list_of_numbers = ListOfNumbers()
         self.drawer = NumberChallengeDraw(self)
+        # Numbers not drawn yet, with a seed every level always gets the same
+        # numbers in the same order
+        self.seed = seed
+        self.numbers = NumberSampler(NumberChallenge.min, NumberChallenge.max)
+        # Exact odds of winning of each slot for the current number (a
+        # Future), shown when the player asks for them
+        self.win_odds = WinOdds(NumberChallenge.min, NumberChallenge.max)
+        self.odds = None
+        self.show_odds = False
         # The current number that the player has to position
         self.current_number = self.generate_num()
 
@@ -345,18 +513,22 @@ class NumberChallenge(Game):
         self.start = False
         self.list_of_numbers.empty()
         self.cubes = Cubes(self.list_of_numbers.number_of_slots, NumberChallenge.cube_types)
+        self.start_numbers()
+
+    def start_numbers(self):
+        """ Puts every number back and draws the first one of the level. """
+        self.numbers.reset(None if self.seed is None else f'{self.seed}-{self.level}')
         # The current number that the player has to position
         self.current_number = self.generate_num()
 
     def generate_num(self):
-        """ Returns a random number between 0 and the max
-        that is not already in the list."""
-        num = randint(0,NumberChallenge.max) 
-        # Returns num only if it is not already in the list
-        # Making sure that we do not get duplicates
-        while num in self.list_of_numbers: 
-            num = randint(0, NumberChallenge.max)
-        return num
+        """ Returns a random number between the min and the max
+        that was not drawn since the start of the level, so it is not
+        already in the list."""
+        number = self.numbers.draw()
+        if self.show_odds:
+            self.odds = self.win_odds.request(self.list_of_numbers, number)
+        return number
         
     def on_key_down(self, key):
         # Defining the behavior of the escape key
@@ -368,18 +540,24 @@ class NumberChallenge(Game):
                 # Goes to the main menu if you're in the game menu
                 elif self.drawer.state == 'Game Menu':
                     self.drawer.state = 'Main Menu'
+        # Shows or hides the odds of each slot
+        elif key == keys.TAB and self.drawer.state == 'Play Screen':
+            self.show_odds = not self.show_odds
+            if self.show_odds:
+                self.odds = self.win_odds.request(self.list_of_numbers, self.current_number)
 
     def on_mouse_down(self, pos):
         if not self.start:
-            for i in NumberChallenge.level_buttons:
+            for i in self.level_buttons:
                 if i.collidepoint(pos):
                     # Finds the level chosen by the player
-                    self.level = NumberChallenge.level_buttons.index(i) + 1
+                    self.level = self.level_buttons.index(i) + 1
                     # Set the lenght of the list of number
                     self.list_of_numbers.check_level(self.level)
                     # Passes the number of slots to the Cubes to create the right number of cubes
                     # through the Cubes class
                     self.cubes = Cubes(self.list_of_numbers.number_of_slots, NumberChallenge.cube_types)
+                    self.start_numbers()
                     # Starts the game
                     self.start = True
                     self.drawer.state = 'Play Screen'
@@ -409,7 +587,7 @@ class NumberChallenge(Game):
         
         if self.lose or self.win:
             # If replay button is clicked
-            if NumberChallenge.replay_button.collidepoint(pos):
+            if self.replay_button.collidepoint(pos):
                 # Reinitializes the values and restart the game
                 self.reinitialize()
                 self.start = True
@@ -419,6 +597,16 @@ class NumberChallenge(Game):
         """ Calls the execute function of the drawer object.
         The drawer object will show the correct screen based on its state """
         self.drawer.execute()
+
+    @property
+    def replay_button(self):
+        return self.button('replay', 'number_button.png', (265, 450))
+
+    @property
+    def level_buttons(self):
+        """ A level button for each level. """
+        return [self.button(f'level {i}', 'number_button.png', (130, 335 + i * 70))
+                for i in range(len(NumberChallenge.levels))]
     
 class Wordle(Game):
     def __init__(self):
@@ -430,22 +618,34 @@ class Wordle(Game):
         self.win = False
         self.start = False
         self.round = 0
-        self.letter_containers = [[], [], [], [], [], []]
-        # dictionary of all 5 letter words to check if a word exist
-        self.valid_dico = 'wordle_dico.txt' 
-        self.valid_words = []
-        # smaller dictionary where the words will be selected
-        self.dico = 'dico.txt'
-        self.dico_content = []   
+        self.letter_containers = []
+        # Lengths of words that have dictionaries, 5 letters by default
+        self.lengths = Assets().lengths
+        self.length = WORD_LENGTH if WORD_LENGTH in self.lengths else self.lengths[0]
+        # Reading the dictionaries in the background while the menu is shown,
+        # the feedback matrix is only needed by the hints
+        Assets().prefetch([f'dictionaries {self.length}'], 1)
+        Assets().prefetch([f'feedback {self.length}'], 4)
+        # Both dictionaries, shared by every round and every replay
+        self.lexicon = None
         self.red_box = None     
-
-        # Creating the buttons and setting their positions
-        self.replay_button = Actor('wordle_button.png')
-        self.replay_button.x = self.drawer.center_pos(self.replay_button)
-        self.replay_button.y = 650
-        self.start_button = Actor('wordle_button.png')
-        self.start_button.y = 650
-        self.start_button.x = self.drawer.center_pos(self.replay_button) 
+        # Future of the hint being computed and the round it was asked for
+        self.hint = None
+        self.hint_round = None
+        self.buttons = {}
+
+    # Both buttons are centered at the bottom of the screen
+    @property
+    def replay_button(self):
+        button = self.button('replay', 'wordle_button.png', (0, 650))
+        button.x = self.drawer.center_pos(button)
+        return button
+
+    @property
+    def start_button(self):
+        button = self.button('start', 'wordle_button.png', (0, 650))
+        button.x = self.drawer.center_pos(button)
+        return button
         
     def reinitialize(self):
         self.lose = False
@@ -453,32 +653,43 @@ class Wordle(Game):
         self.start = True
         # self.replay = False
         self.round = 0
-        self.letter_containers = [[], [], [], [], [], []]   
-        self.handle_typing = Typing(self.valid_words, self.dico_content)  
         self.red_box = None
+        self.hint = None
+        self.hint_round = None
         self.setting_up()  
 
-    @staticmethod
-    def get_content(file):
-        """ Reads the content of a dictionary file and returns a list of
-        all the words of the dictionary."""
-        content = []
-        with open(file, 'r') as dico:
-            for line in dico:
-                # Remove leading/trailing whitespace and adding it to the list
-                content.append(line.strip()) 
-        return content
-
     def setting_up(self):
-        """ Gets the content of both th dictionaries and create a Typing object
-        that will handle the typing and create th eletter containers."""
-        self.dico_content = self.get_content(self.dico)
-        self.valid_words = self.get_content(self.valid_dico)
-        self.handle_typing = Typing(self.valid_words, self.dico_content) # creating the Typing object
+        """ Gets the lexicon of the chosen length (the dictionaries are only read 
+        from disk the first time, usually in the background) and create a Typing object that will handle the 
+        typing and create the letter containers."""
+        self.feedback = Assets().get(f'dictionaries {self.length}')
+        self.lexicon = self.feedback.lexicon
+        self.hint_engine = HintEngine(self.feedback)
+        self.handle_typing = Typing(self.lexicon, self.feedback) # creating the Typing object
+
+        # Size of the board: the cells are 90 pixels apart with 5 letters and
+        # shrink so that longer words and more rounds fit in the window
+        rounds = self.handle_typing.rounds
+        self.pitch = min(90, 540 // self.length, 540 // rounds)
+        self.cell_size = self.pitch * 65 // 90
+        self.font_size = self.pitch * 80 // 90
+        self.board_x = (600 - self.length * self.pitch) // 2 + 5
+
         # Creating the letter containers            
-        for i in range(6):
-            for j in range(5):
-                self.letter_containers[i].append(LetterContainer(80 + j * 90, 160 + i * 90))
+        self.letter_containers = [[] for _ in range(rounds)]
+        for i in range(rounds):
+            for j in range(self.length):
+                x, y = self.cell_position(i, j)
+                self.letter_containers[i].append(LetterContainer(x, y, width=self.cell_size, height=self.cell_size))
+
+    def cell_position(self, row, column):
+        """ Returns the position of the top left corner of a letter container. """
+        return (self.board_x + column * self.pitch, 160 + row * self.pitch)
+
+    def letter_position(self, row, column):
+        """ Returns the position where the letter of a container is written. """
+        x, y = self.cell_position(row, column)
+        return (x + self.pitch // 9, y + self.pitch // 18)
 
     def on_key_down(self, key):
         # Handle the behavior o the escape key
@@ -491,6 +702,13 @@ class Wordle(Game):
                 elif self.drawer.state == 'Game Menu':
                     self.drawer.state = 'Main Menu'
 
+        # Choosing the length of the words in the game menu
+        if self.drawer.state == 'Game Menu' and key in (keys.LEFT, keys.RIGHT):
+            index = self.lengths.index(self.length) + (1 if key == keys.RIGHT else -1)
+            self.length = self.lengths[index % len(self.lengths)]
+            Assets().prefetch([f'dictionaries {self.length}'], 0)
+            Assets().prefetch([f'feedback {self.length}'], 4)
+
         # Pressing return starts the game 
         if not self.start:
             if key == keys.RETURN:
@@ -505,11 +723,15 @@ class Wordle(Game):
             elif key == 8: # if Backspace is pressed
                 # remove the last letter typed
                 self.handle_typing.remove_letter(self.round)
+            elif key == keys.TAB and self.drawer.state == 'Play Screen':
+                self.ask_hint()
             elif key == keys.RETURN: # when a word is submitted
                 validate = self.handle_typing.validate(self.round)
                 if validate == 'Invalid': # If the word is not in the dictionary
                     # Creating a red box around the guess if the word does not exist
-                    self.red_box = LetterContainer(75, 155 + 90 * self.round, width=435, height=75)
+                    x, y = self.cell_position(self.round, 0)
+                    width = self.length * self.pitch - (self.pitch - self.cell_size)
+                    self.red_box = LetterContainer(x - 5, y - 5, width=width + 10, height=self.cell_size + 10)
                 elif validate:
                     # if the word is in the dictionary, goes to the next round
                     self.round += 1
@@ -517,7 +739,7 @@ class Wordle(Game):
                     right_count = 0 # number of times  letter is at the right place
                     # Checks the state and changes the color of the box for each
                     # letter while increasing the right count
-                    for cell in range(5):
+                    for cell in range(self.length):
                             if self.handle_typing.state[self.round - 1][cell] == 0:
                                 self.letter_containers[self.round - 1][cell].change_color('grey')
                             elif self.handle_typing.state[self.round - 1][cell] == 1:
@@ -526,19 +748,27 @@ class Wordle(Game):
                                 self.letter_containers[self.round - 1][cell].change_color('green')
                                 right_count += 1
                                 # if all the letters are right then the player wins
-                                if right_count == 5:
+                                if right_count == self.length:
                                     self.win = True
                                     self.drawer.state = 'Win' 
                     
                     # If it is the last round and the player did not win then they lose
-                    if self.round == 6 and not self.win:
+                    if self.round == self.handle_typing.rounds and not self.win:
                         self.lose = True
                         self.drawer.state = 'Lose'
 
-            # deletes the red box around the word when you have less than 5 letters        
-            if self.handle_typing.current_slot <= 4:
+            # deletes the red box around the word when it is not complete anymore        
+            if self.handle_typing.current_slot < self.length:
                 self.red_box = None
 
+    def ask_hint(self):
+        """ Asks the hint engine for the best next guesses. The ranking is
+        computed in a worker thread and shown by the drawer when ready. """
+        if self.hint is not None and self.hint_round == self.round:
+            return # already asked for this round
+        self.hint = self.hint_engine.request(self.handle_typing.candidates)
+        self.hint_round = self.round
+
     def on_mouse_down(self, pos):
         # Start the game when the start button is clicked
         if self.drawer.state == 'Game Menu':
@@ -554,7 +784,7 @@ class Wordle(Game):
                 self.reinitialize()
                 self.drawer.state = 'Play Screen'
 
-    def update(self):
+    def update(self, dt):
         pass
 
     def draw(self):
@@ -564,89 +794,81 @@ class Wordle(Game):
         self.drawer.execute()
 
 class Snake(Game):    
-    def __init__(self):
+    # The simulation moves by fixed steps of STEP seconds whatever the frame rate
+    STEP = 1 / 60
+    # Longest frame taken into account, a slower frame slows the game down
+    # instead of running a burst of steps
+    MAX_FRAME = 0.25
+    # Drawing the snake between its last two positions for smoother motion
+    interpolate = True
+    # Stress test: a bot plays in a large arena with more and more apples
+    # and bombs, every level lasts stress_frames frames and the time taken
+    # to update and draw the game is reported at the end
+    stress_levels = (10, 100, 1000)
+    stress_frames = 300
+    stress_arena = (3000, 3000)
+
+    def __init__(self, seed=None):
         self.type = 'Snake'
         self.drawer = SnakeDraw(self)
-        self.player = SnakePlayer() 
+        # Snake, items and score, the seed makes the items reproducible
+        self.seed = seed
+        self.world = SnakeWorld(seed)
+        self.stress_level = None # index in stress_levels during the stress test
+        self.stress_results = []
         # Game Variables with default values as attributes
         self.lose = False
         self.begin = False
         self.start = False
-        self.score = 0
+        self.accumulator = 0 # time not simulated yet
+        self.alpha = 0 # position between the last two steps when drawing
         self.drawer.state = 'Game Menu'
-        self.replay_button = Actor('wordle_button.png', (265, 650))
-        self.start_button = Actor('wordle_button.png', (265, 650))
-        self.apple = Actor('apple.png', (randint(50, 550), randint(50, 750)))
-        self.bomb = Actor('bomb.png', (randint(50, 550), randint(50, 750)))
+        self.buttons = {}
+
+    @property
+    def replay_button(self):
+        return self.button('replay', 'wordle_button.png', (265, 650))
+
+    @property
+    def start_button(self):
+        return self.button('start', 'wordle_button.png', (265, 650))
     
     def reinitialize(self):
         self.lose = False
         self.win = False
         self.start = False
         self.begin = False
-        self.score = 0
-        self.player = SnakePlayer()
+        self.accumulator = 0
+        self.alpha = 0
+        if self.stress_level is not None or self.drawer.state == 'Stress Report':
+            # Back to the normal arena after the stress test
+            self.stress_level = None
+            self.world = SnakeWorld(self.seed)
+        else:
+            self.world.reset()
 
     def on_key_down(self, key):
         # Behavior of the escape key
         if key == keys.ESCAPE:
                 # Reinitializes the game variables and goes to the game menu
-                if self.drawer.state == 'Play Screen' or self.drawer.state == 'Lose' or self.drawer.state == 'Win':
+                if self.drawer.state in ('Play Screen', 'Lose', 'Win', 'Stress Report'):
                     self.reinitialize()
                     self.drawer.state = 'Game Menu'
                 # Goes to the main menu if you're in the game menu
                 elif self.drawer.state == 'Game Menu':
                     self.drawer.state = 'Main Menu'
 
+        if key == keys.S and self.drawer.state == 'Game Menu':
+            self.start_stress()
+            return
+
         if self.begin:
-            # Managing the movements of the snake based on the keys
-            if key == keys.LEFT:
-                self.player.direction = 'left' # set snake direction to left
-                # Changing the angle to the right one based on the previous angle
-                if self.player.rotation_angle == 180 or self.player.rotation_angle == -180:
-                    self.player.rotation_angle -= 90 
-                elif self.player.rotation_angle == 0 or self.player.rotation_angle == 360 or self.player.rotation_angle == -360:
-                    self.player.rotation_angle += 90
-                self.player.move_left() # moving the snake in the corresponding direction
-        
-            elif key == keys.RIGHT:
-                self.player.direction = 'right' # set snake direction to right
-                # Changing the angle to the right one based on the previous angle
-                if self.player.rotation_angle == 180 or self.player.rotation_angle == -180:
-                    self.player.rotation_angle += 90 
-                elif self.player.rotation_angle == 0 or self.player.rotation_angle == -360 or self.player.rotation_angle == -360:
-                    self.player.rotation_angle -= 90
-                self.player.move_right() # moving the snake in the corresponding direction
-
-            elif key == keys.UP:
-                self.player.direction = 'up' # set snake direction to up
-                # Changing the angle to the right one based on the previous angle
-                if self.player.rotation_angle == 90 or self.player.rotation_angle == -270: 
-                    self.player.rotation_angle -= 90 
-                elif self.player.rotation_angle == -90 or self.player.rotation_angle == 270:
-                    self.player.rotation_angle += 90
-                self.player.move_up() # moving the snake in the corresponding direction
-
-            elif key == keys.DOWN:
-                self.player.direction = 'down' # set snake direction to down
-                # Changing the angle to the right one based on the previous angle
-                if self.player.rotation_angle == 90 or self.player.rotation_angle == -270:
-                    self.player.rotation_angle += 90 
-                elif self.player.rotation_angle == -90 or self.player.rotation_angle == 270:
-                    self.player.rotation_angle -= 90 
-                self.player.move_down() # moving the snake in the corresponding direction
-
-            # subtracts from the angle so that it always is withing the
-            # range (-360, 360)
-            while self.player.rotation_angle > 360:
-                self.player.rotation_angle -= 360
-            while self.player.rotation_angle < -360:
-                self.player.rotation_angle += 360
+            # Managing the movements of the snake based on the keys,
+            # the snake can't turn back on itself
+            directions = {keys.LEFT: 'left', keys.RIGHT: 'right', keys.UP: 'up', keys.DOWN: 'down'}
+            if key in directions:
+                self.world.player.turn(directions[key])
             
-            # Rotating the head of the snake
-            original_image = self.player.head()
-            original_image.angle = self.player.rotation_angle
-            self.rotated_image = original_image
         else:
             # if the game has started, pressing any key will make the snake move
             # by setting self.begin to True
@@ -672,153 +894,126 @@ class Snake(Game):
                 self.start = True
                 self.drawer.state = 'Play Screen'
 
-    def update(self):
-        if self.begin:
-            # If snake head touches apple, increase score
-            if self.player.head().colliderect(self.apple):
-                # "Respawn" the apple by changing its position
-                self.apple.pos = (randint(50, 550), randint(50, 750))
-                self.score += 10
-                # Increase the lenght of the body of the snake
-                self.player.add()
-
-            # if snahead touches a bomb
-            if self.player.head().colliderect(self.bomb):
-                if len(self.player.body()) > 1:
-                    # "Respawn" the bomb by changing its position
-                    self.bomb.pos = (randint(50, 550), randint(50, 750))
-                    self.player.remove() # decrease the lenght of the body of the snake
-                else:
-                    # Loses if the body of the snake is too short
-                    self.lose = True
-                    self.drawer.state = 'Lose'
-
-            # if the snake's head hits the wall, the player loses
-            if self.player.collide_body() or self.player.collide_wall():
-                self.lose = True
-                self.drawer.state = 'Lose'
-
-            # Increases the speed proportionally to the player's score
-            self.player.move(self.score/40) 
+    def update(self, dt):
+        """ Runs as many simulation steps as the time elapsed allows. """
+        if self.begin and not self.lose:
+            start = time.perf_counter()
+            self.bot_time = 0
+            self.accumulator += min(dt, Snake.MAX_FRAME)
+            while self.accumulator >= Snake.STEP and not self.lose:
+                self.step()
+                self.accumulator -= Snake.STEP
+            self.alpha = self.accumulator / Snake.STEP if Snake.interpolate else 1
+            # The stress test measures the game, not the bot playing it
+            self.update_time = time.perf_counter() - start - self.bot_time
+
+    def run(self, steps):
+        """ Runs up to steps simulation steps at once without drawing anything
+        (for tests and bots). Returns the number of steps run before losing. """
+        self.begin = True
+        for i in range(steps):
+            if self.lose:
+                return i
+            self.step()
+        return steps
+
+    def step(self):
+        """ Moves the game forward by one fixed step of STEP seconds. """
+        if self.stress_level is not None:
+            # The bot plays and the snake starts again instead of losing
+            start = time.perf_counter()
+            direction = self.bot.choose()
+            self.bot_time += time.perf_counter() - start
+            if direction is not None and direction != self.world.player.direction:
+                self.world.player.turn(direction)
+            self.world.step()
+            self.stress_steps += 1
+            if self.world.lose:
+                self.world.reset()
+                self.bot = GreedyBot(self.world)
+            return
+        self.world.step()
+        if self.world.lose:
+            self.lose = True
+            self.drawer.state = 'Lose'
+
+    ############### Stress test ###############
+
+    def start_stress(self):
+        self.stress_results = []
+        self.start_stress_level(0)
+        self.start = True
+        self.begin = True
+        self.drawer.state = 'Play Screen'
+
+    def start_stress_level(self, level):
+        entities = Snake.stress_levels[level]
+        self.stress_level = level
+        self.world = SnakeWorld(self.seed, *Snake.stress_arena, apples=entities // 2, bombs=entities - entities // 2)
+        self.bot = GreedyBot(self.world)
+        self.stress_times = [] # (update time, draw time) of every frame
+        self.stress_steps = 0
+        self.update_time = 0
+        self.bot_time = 0 # time taken by the bot during the frame
+
+    def end_stress_frame(self, draw_time):
+        """ Records the times of a frame and goes to the next level after
+        stress_frames frames. """
+        self.stress_times.append((self.update_time, draw_time))
+        self.update_time = 0
+        if len(self.stress_times) < Snake.stress_frames:
+            return
+        update, draw = np.array(self.stress_times).T * 1000
+        self.stress_results.append((Snake.stress_levels[self.stress_level], self.stress_steps / len(update),
+                                    update.mean(), draw.mean(), np.percentile(update + draw, 95)))
+        if self.stress_level + 1 < len(Snake.stress_levels):
+            self.start_stress_level(self.stress_level + 1)
+        else:
+            self.stress_level = None
+            self.drawer.state = 'Stress Report'
+            for row in self.stress_report():
+                print(''.join(cell.rjust(14) for cell in row))
+
+    def stress_report(self):
+        """ Returns the rows of the stress test's report, a frame must take
+        less than 16.7 ms to hold 60 FPS. """
+        rows = [('entities', 'steps', 'update ms', 'draw ms', '95% frame')]
+        for entities, steps, update, draw, slowest in self.stress_results:
+            rows.append((str(entities), f'{steps:.1f}', f'{update:.2f}', f'{draw:.2f}', f'{slowest:.2f}'))
+        return rows
 
     def draw(self):
         """ Calls the execute function of the drawer object.
         The drawer object will show the correct screen based on
         its state.  """
+        start = time.perf_counter()
         self.drawer.execute()
+        if self.stress_level is not None and self.drawer.state == 'Play Screen':
+            self.end_stress_frame(time.perf_counter() - start)
 
 ############### For number Challenge ###############
 
-# Class that manages the list of number: adding numbers, checking the position so 
-# that the list remains ordered
-class ListOfNumbers:
-    def __init__(self, number_of_slots=0):
-        self.number_of_slots = number_of_slots
-        self.content = {i:'' for i in range(1, self.number_of_slots + 1)}
-    
-    def __getitem__(self, slot):
-        return self.content[slot]
-    
-    def __setitem__ (self, slot, value) -> None:
-        self.content[slot] = value
-    
-    def __len__(self):
-        return len(self.content)
-    
-    def add_number(self, num, slot):
-        """ Tries adding the num in the list at the position provided.
-        Returns None if no available slots to put the number.
-        Returns False if there are available slots but slot is 
-        not one of them. Returns True if the number was added successfully  """
-                   
-        available_slots = self.check_available_slots(num)
-        if not available_slots: # if it is empty
-            return None
-        
-        # checks if 'slot' is in the available slots, returns False if not
-        # meaning that the number cannot be at position 'slot' but could
-        # be place elsewhere in the list
-        for i in available_slots:
-            if i == slot:
-                self[slot] = num
-                return True
-        return False
-        
-    def __str__(self):
-        repr = ''
-        for i in range(1, self.number_of_slots + 1):
-            repr += f'{i} : {self[i]}\n' 
-        return repr
-    
-    def check_available_slots(self, num, start = 1, available_slots = []):
-        """ Checks and returns the available slots (the potential slots where
-        the number could be placed in the list). Returns the available slots as a
-        list of number or returns None if none were found."""
-        
-        # if the list is empty returns all the slots starting from 'start'
-        if all(self[i] == '' for i in range(start, self.number_of_slots + 1)):
-            return [i for i in range(start, self.number_of_slots + 1)]
-
-        # if the start is greater than the number of slots then
-        # stop the search because everything was checked
-        if start == self.number_of_slots + 2:
-            return available_slots
-        
-        # If the slot is empty, adds it to the available slots
-        if self[start] == '':
-            available_slots.append(start)
-            # Recursively calls the function for the next slot
-            return self.check_available_slots(num, start = start + 1, available_slots = available_slots)
-        
-        # If the current number is greater than the number we need to position 
-        # meaning we can't position the number further, returns available slots
-        elif self[start] > num: 
-            return available_slots
-        
-        # If the current number is less than the number we need to position meaning 
-        # we can't put it before that number 
-        elif self[start] < num:
-            available_slots = [] # empty available slots 
-            # keep checking for the next slot
-            return self.check_available_slots(num, start = start + 1, available_slots = available_slots)
-    
-    def check_level(self, level):
-        """ Check the level chosen by the user and changes the value of the
-        number_of_slots attribute accordingly. 
-        Updates the content and deletes any previous values.
-        Returns None."""
-
-        if level == 1:
-            self.number_of_slots = 5
-        elif level == 2:
-            self.number_of_slots = 10
-        elif level == 3:
-            self.number_of_slots = 15
-        elif level == 4:
-            self.number_of_slots = 20
-        elif level == 5:
-            self.number_of_slots = 25
-        
-        self.content = {i:'' for i in range(1, self.number_of_slots + 1)}
-
-    def full(self):
-        """ Returns true if the list is full and false otherwise."""
-        return all(i != '' for i in self.content.values())
-    
-    def empty(self):
-        """ Empty the content of the list by setting evry value to an
-        empty string. """
-        self.content = {i:'' for i in range(1, self.number_of_slots + 1)}
-    
-    def __contains__(self, number):
-        return number in self.content.values()
-
 # Class that manages the creation and positioning of the cubes 
 class Cubes:
+    # Layouts already computed: (number of cubes, width, height): layout
+    layouts = {}
+    # The cubes fill columns from the top, the first cube is centered on
+    # (left, top) and the cubes of a column are step pixels apart. A column
+    # ends before bottom, the columns are column_width pixels apart or less
+    # when they don't fit in the window with label_width pixels left for the
+    # labels of the last one
+    left = 50
+    top = 200
+    bottom = 700
+    step = 50
+    column_width = 150
+    label_width = 100
+
     def __init__(self, number_of_cubes, cube_types=['blue_cube1.png']):
         self.number_of_cubes = number_of_cubes
         self.cube_types = cube_types
         self.content = []
+        self.layout = Cubes.grid_layout(number_of_cubes, WIDTH, HEIGHT)
         self.create_cubes()
     
     def __contains__(self, item):
@@ -830,95 +1025,34 @@ class Cubes:
     def __setitem__ (self, index, value) -> None:
         self.content[index] = value
     
+    @staticmethod
+    def grid_layout(number_of_cubes, width, height):
+        """ Returns the positions of every cube and of its labels as a list of
+        (cube center, slot label, number label, odds label), computed once
+        for each number of cubes and window size. """
+        key = (number_of_cubes, width, height)
+        if key not in Cubes.layouts:
+            rows = max(1, (min(Cubes.bottom, height) - Cubes.top) // Cubes.step)
+            columns = -(-number_of_cubes // rows)
+            room = width - Cubes.left - Cubes.label_width
+            column_width = min(Cubes.column_width, room // max(columns - 1, 1))
+            layout = []
+            for i in range(number_of_cubes):
+                column, row = divmod(i, rows)
+                x = Cubes.left + column * column_width
+                y = Cubes.top + row * Cubes.step
+                layout.append(((x, y), (x - 15, y - 10), (x + 35, y - 10), (x + 35, y - 7)))
+            Cubes.layouts[key] = layout
+        return Cubes.layouts[key]
+
     def create_cubes(self):
         """ Generates and returns a list of number_of_slots amount of cube (actor objects). 
         The color of each cube is randomly generated. 
         Returns a list of Actor objects"""
 
-        # Changes the x positions of the cubes tofit the screen depending on the number
-        # of cubes
-        for i in range(self.number_of_cubes):
-            if i == 0:
-                self.content.append(Actor(self.cube_types[randint(0, 2)], (50, 200)))
-            elif i < 10:
-                self.content.append(Actor(self.cube_types[randint(0, 2)], (50, self.content[i - 1].y + 50)))
-            elif i == 10:
-                self.content.append(Actor(self.cube_types[randint(0, 2)], (200, 200)))
-            elif i > 10 and i < 20:
-                self.content.append(Actor(self.cube_types[randint(0, 2)], (200, self.content[i - 1].y + 50)))
-            elif i == 20:
-                self.content.append(Actor(self.cube_types[randint(0, 2)], (350, 200)))
-            elif i > 20:
-                self.content.append(Actor(self.cube_types[randint(0, 2)], (350, self.content[i - 1].y + 50)))
-
-############### For Snake ###############
-
-class SnakePlayer:
-    snake_parts = ['mini_snake_head.png', 'snake_body.png','mini_snake_tail.png']
-    
-    def __init__(self):
-        self.content = [Actor('mini_snake_head.png', (300, 300)), Actor('1st_body.png', (340, 300)), Actor('mini_snake_tail.png', (380, 300))]
-        self.rotation_angle = 90
-        self.rotated_image = self.content[0]
-        self.rotated_image.angle = self.rotation_angle
-        self.direction = 'left'
-
-    def head(self): # Maybe make it a property
-        return self.content[0]
-    
-    def tail(self): # Maybe make it a property
-        return self.content[-1]
-    
-    def body(self):
-        return self.content[1:-2]
-    
-    # def collide_tail(self):
-    #     return self.content[0].colliderect(self.content[-1])
-
-    def collide_body(self):
-        return any([self.content[0].colliderect(i) for i in self.content[2:]])
-
-    def collide_wall(self):
-        if self.content[0].x >= 600 or self.content[0].x <= 0:
-            return True
-        if self.content[0].y >= 800 or self.content[0].y <= 0: 
-            return True
-        return False
-    
-    def add(self):
-        self.content.insert(-1, Actor('mini_snake_body.png', (self.content[-2].x + 25, self.content[-2].y)))
-        self.content[-1].pos = (self.content[-2].x + 40, self.content[-2].y)
-
-    def remove(self):
-        self.content.pop(-2)
-        self.content[-1].pos = (self.content[-2].x + 40, self.content[-2].y)
-
-    def move(self, speed):
-        self.speed = speed
-        if self.direction == 'left':
-            self.move_left()
-        elif self.direction == 'right':
-            self.move_right()
-        elif self.direction == 'up':
-            self.move_up()
-        elif self.direction == 'down':
-            self.move_down()
-
-    def move_right(self):
-        for i in self.content:
-            i.x += 3 + self.speed
-
-    def move_left(self):
-        for i in self.content:
-            i.x -= 3 + self.speed
-            
-    def move_up(self):
-        for i in self.content:
-            i.y -= 3 + self.speed
-
-    def move_down(self):
-        for i in self.content:
-            i.y += 3 + self.speed
+        # The positions of the cubes come from the layout of the level
+        for cube, index, value, odds in self.layout:
+            self.content.append(actor(self.cube_types[randint(0, len(self.cube_types) - 1)], cube))
 
 ############### For Wordle ###############
 
@@ -947,61 +1081,136 @@ class LetterContainer:
     def change_color(self, color):
         self.color = color
 
-class Typing:
-    def __init__(self, valid_words, dico):
-        self.dico = dico
-        self.valid_words = valid_words
-        self.current_slot = 0
-        self.generate_word()
-        self.guess = [[], [], [], [], [], []]
-        self.state = [[None, None, None, None, None], [None, None, None, None, None], 
-                      [None, None, None, None, None], [None, None, None, None, None], 
-                      [None, None, None, None, None], [None, None, None, None, None]]
-    
-    def generate_word(self):
-        max = len(self.dico) - 1
-        self.word = self.dico[randint(0, max)]
-        self.word_counter = Counter(self.word)
-    
-    def check_word(self, round):
-        # used to make sure the game displays the right colors (hints)
-        # when a letter is multiplied
-        counter = Counter(self.word)
-        for i in range(5):
-            if self.guess[round][i] == self.word[i]:
-                self.state[round][i] = 2
-                if counter[self.guess[round][i]] != 0:
-                    counter[self.guess[round][i]] -= 1
-                else:
-                    # If the letter had been marked before, 
-                    # marks it yellow instead and marks it green at the current position
-                    self.state[round][self.guess[round].index(self.word[i])] = 0
-            elif self.guess[round][i] in ''.join(self.word) and counter[self.guess[round][i]] != 0:
-                self.state[round][i] = 1
-                counter[self.guess[round][i]] -= 1
-            else:
-                self.state[round][i] = 0  
-    
-    def enter_letter(self, letter, round):
-        if self.current_slot < 5:
-            self.guess[round].append(letter)
-            self.current_slot += 1
-
-    def remove_letter(self, round):
-        if len(self.guess[round]) >= 1:
-            self.guess[round].pop()
-            self.current_slot -= 1
-
-    def validate(self, round):
-        if self.current_slot == 5: 
-            if ''.join(self.guess[round]) in self.valid_words:
-                self.check_word(round)
-                self.current_slot = 0
-                return True
-            else:
-                return 'Invalid'
-        return False
-        
+############### Assets ###############
+
+# Loads the images and the dictionaries, from the bundle built by
+# asset_bundle when there is one. The main menu only waits for its
+# icons, the rest is loaded by a background thread after the first frame,
+# starting with what the player is the most likely to need next. An asset
+# needed before the thread got to it is loaded right away, or waited for if
+# the thread is loading it, so nothing is loaded twice: the Actors are
+# created by actor() which gets their image here first. Singleton so every
+# game shares the same assets, created the first time an asset is needed
+# (importing this file loads nothing).
+class Assets:
+    _instance = None
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if hasattr(self, 'futures'):
+            return
+        self.loaders = {} # name: function loading the asset, images need none
+        self.futures = {} # name: Future of the asset once its loading started
+        self.times = {} # name: (seconds to load it, thread that loaded it)
+        self.queue = PriorityQueue() # (priority, order, name) of the assets to prefetch
+        self.order = 0
+        self.lock = threading.Lock()
+        self.thread = None
+        self.first_frame = None # seconds from the start to the first frame
+        self.reported = False
+        attach() # the images are loaded by pygame zero
+        # Images and dictionaries packed by asset_bundle, the loose files are
+        # used when there is no bundle
+        self.bundle = Bundle.open(os.path.join(dico_path, BUNDLE))
+        if self.bundle is not None:
+            Lexicon.bundles[dico_path] = self.bundle
+            # The images are views of the mapped file, creating them costs
+            # nothing so pgzero's loader gets all of them now and every Actor
+            # uses them. With ASSET_BUNDLE_CHECK=1, the images edited since
+            # the bundle was built are loaded from their files
+            for name in self.bundle.names('image'):
+                if self.bundle.current(name):
+                    images.cache[images.cache_key(name, (), {})] = self.bundle.image(name)
+        # Every dictionary can be prefetched, the Wordle game asks for them by
+        # length
+        self.lengths = Lexicon.lengths(dico_path)
+        for length in self.lengths:
+            self.add(f'dictionaries {length}', partial(load_dictionaries, length))
+            self.add(f'feedback {length}', partial(load_feedback, length))
+
+    def add(self, name, load):
+        """ Sets the function loading an asset that is not an image. """
+        self.loaders[name] = load
+
+    def get(self, name):
+        """ Returns the asset, it is loaded now if nothing loaded it yet. """
+        future, owner = self.claim(name)
+        if owner:
+            self.load(name, future)
+        return future.result()
+
+    def claim(self, name):
+        """ Returns the Future of the asset and True if the caller has to
+        load it, False if it is already loaded or being loaded. """
+        with self.lock:
+            if name in self.futures:
+                return self.futures[name], False
+            self.futures[name] = Future()
+            return self.futures[name], True
+
+    def load(self, name, future):
+        start = time.perf_counter()
+        try:
+            future.set_result(self.loaders.get(name, partial(images.load, name))())
+        except Exception as error:
+            future.set_exception(error)
+        thread = 'main' if threading.current_thread() is threading.main_thread() else 'background'
+        self.times[name] = (time.perf_counter() - start, thread)
+
+    def prefetch(self, names, priority=2):
+        """ Queues assets to be loaded in the background, the lowest priority
+        first and in the order they were queued for the same priority. """
+        for name in names:
+            self.queue.put((priority, self.order, name))
+            self.order += 1
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work, name='assets', daemon=True)
+            self.thread.start()
+
+    def work(self):
+        """ Loads the queued assets, prints the startup report once there
+        is nothing left to load. """
+        while True:
+            priority, order, name = self.queue.get()
+            future, owner = self.claim(name)
+            if owner:
+                self.load(name, future)
+            if self.queue.empty() and not self.reported:
+                self.reported = True
+                print(self.report())
+
+    def frame(self):
+        """ Called after each frame. After the first one, every image and
+        the default dictionaries are loaded in the background. """
+        if self.first_frame is None:
+            self.first_frame = time.perf_counter() - started
+            self.prefetch([name for game in games for name in game_images[game]], 2)
+            if f'dictionaries {WORD_LENGTH}' in self.loaders:
+                self.prefetch([f'dictionaries {WORD_LENGTH}'], 3)
+
+    def report(self):
+        """ Returns the time to the first frame and the time taken by each
+        asset, in the order they were loaded. """
+        lines = ['Startup report']
+        if self.first_frame is not None:
+            lines.append(f'  first frame after {self.first_frame * 1000:.0f} ms')
+        for name, (seconds, thread) in list(self.times.items()):
+            lines.append(f'  {name:28s} {seconds * 1000:8.1f} ms  {thread}')
+        return '\n'.join(lines)
+
+def load_dictionaries(length):
+    """ Reads the Wordle dictionaries of a length and maps their feedback
+    matrix if a previous launch saved it. Returns the FeedbackTable. """
+    return FeedbackTable(Lexicon(length, dico_path))
+
+def load_feedback(length):
+    """ Builds the feedback matrix of a length, the game plays without it
+    until then. Returns the matrix. """
+    return Assets().get(f'dictionaries {length}').matrix
+
 ###################################### Pygame Zero Main Part ######################################
 
 # To keep track of the games and the state
@@ -1023,13 +1232,22 @@ WIDTH = 600
 # Creating a session object
 session = Session()
 
-# Create the game icons
-game_icons = [Actor('number_challenge_icon.png', (120, 400)), Actor('snake_icon.png', (460, 560)), Actor('wordle_icon.png', (120, 700))]
+# The game icons, created with the first main menu since their images can
+# only be loaded once there is a screen
+game_icons = []
 
 games = ['Number Challenge', 'Snake', 'Wordle']
 
+# Images of each game, in the order they are needed
+game_images = {'Number Challenge': ['number_button.png', 'blue_cube1.png', 'pink_cube1.png', 'purple_cube1.png'],
+               'Snake': ['wordle_button.png', 'bg_image_snake.png', 'apple.png', 'bomb.png', 'mini_snake_head.png',
+                         '1st_body.png', 'mini_snake_body.png', 'mini_snake_body_v.png', 'mini_snake_tail.png'],
+               'Wordle': ['wordle_button.png']}
+
 game_factory = GameFactory() # Creating the game factory
 
+main_menu_cache = ScreenCache() # Copy of the main menu
+
 def on_key_down(key):
     # If no game is selcted, exit, otherwise, execute the function for the
     # selected game
@@ -1043,36 +1261,100 @@ def on_mouse_down(pos):
     # If no game is selected
     # Creates an instance of the game chosen by the user
     if session.game is None or session.game.drawer.state == 'Main Menu':
-        for i in game_icons:
+        for i in icons():
             if i.collidepoint(pos):
+                # The images of the selected game are loaded first
+                Assets().prefetch(game_images[games[game_icons.index(i)]], 0)
                 session.game = game_factory.create_game(games[game_icons.index(i)])           
     else:
         # Otherwise, execute the function for the selected game
         session.game.on_mouse_down(pos)
 
-def update() :
-    # Execute the function for the selected game if a game is selected
+def update(dt) :
+    # Execute the function for the selected game if a game is selected,
+    # dt is the time since the last frame in seconds
     if session.game is None or session.game.drawer.state == 'Main Menu':
         pass
     else:
-        session.game.update()
+        session.game.update(dt)
 
 def draw():
-    # Display the main menu screen
+    # Display the main menu screen (drawn once then copied)
     if session.game is None or session.game.drawer.state == 'Main Menu':
-        screen.fill(('#00001b'))
-        screen.draw.text('MINI GAMES', (150, 50), color=(255,255,255), fontsize=65)
-        screen.draw.text('WHICH GAME DO \nYOU WANNA PLAY', (100, 150), color=(255,255,255), fontsize=65)
-
-        screen.draw.text('Number \n Challenge', (250, 320), color=('#ffffff'), fontsize=90) 
-        screen.draw.text(f'{games[1]}', (130, 530), color=('#ffffff'), fontsize=90) 
-        screen.draw.text(f'{games[2]}', (280, 670), color=('#ffffff'), fontsize=90) 
-
-        for icon in game_icons:
-            icon.draw()
+        main_menu_cache.draw('Main Menu', None, draw_main_menu)
     else:
         # Execute the function for the selected game if a game is selected
         session.game.draw()
+    Assets().frame()
+
+def draw_main_menu():
+    screen.fill(('#00001b'))
+    screen.draw.text('MINI GAMES', (150, 50), color=(255,255,255), fontsize=65)
+    screen.draw.text('WHICH GAME DO \nYOU WANNA PLAY', (100, 150), color=(255,255,255), fontsize=65)
+
+    screen.draw.text('Number \n Challenge', (250, 320), color=('#ffffff'), fontsize=90) 
+    screen.draw.text(f'{games[1]}', (130, 530), color=('#ffffff'), fontsize=90) 
+    screen.draw.text(f'{games[2]}', (280, 670), color=('#ffffff'), fontsize=90) 
+
+    for icon in icons():
+        icon.draw()
+
+def icons():
+    """ Returns the game icons, they are created the first time. """
+    if not game_icons:
+        names = ['number_challenge_icon.png', 'snake_icon.png', 'wordle_icon.png']
+        for name, pos in zip(names, [(120, 400), (460, 560), (120, 700)]):
+            game_icons.append(actor(name, pos))
+    return game_icons
+
+def actor(image, pos):
+    """ Returns an Actor of the image, loaded by the assets. The images need
+    a screen: without the game's window, headless() must be called first. """
+    if pygame.display.get_surface() is None:
+        raise RuntimeError(f'{image} can only be loaded with a screen, call headless() first')
+    Assets().get(image)
+    return Actor(image, pos)
+
+def attach():
+    """ Imports the parts of pygame zero used by the games. Only done when
+    the games are launched or need their images, importing this file does
+    not import pygame zero. """
+    global Actor, keys, images, ptext, exit
+    from pgzero.actor import Actor
+    from pgzero.constants import keys
+    from pgzero.loaders import images
+    from pgzero import ptext
+    from pgzero.game import exit
+
+def headless():
+    """ Attaches a screen that is never shown (SDL's dummy video driver) so
+    the games can be created, played and drawn without a window, in tests and
+    simulations. Importing this file and playing the games does not need a
+    screen, drawing them, using their buttons or sending them keys does.
+    Returns the screen. """
+    global screen
+    from pgzero import loaders
+    from pgzero.screen import Screen
+    import pgzero.game
+    attach()
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    pygame.display.init()
+    pygame.font.init()
+    surface = pygame.display.set_mode((WIDTH, HEIGHT))
+    loaders.set_root(dico_path)
+    pgzero.game.screen = surface # the screen the Actors are drawn on
+    screen = Screen(surface)
+    return screen
+
+def launch():
+    """ Opens the window and runs the games with pygame zero. """
+    # Only imported here: the runner initializes pygame and its mixer
+    from pgzero import loaders
+    from pgzero.runner import run_mod
+    attach()
+    loaders.set_root(dico_path)
+    run_mod(sys.modules[__name__])
 
 # Running the game
-pgzrun.go()
+if __name__ == '__main__':
+    launch()
@@ -0,0 +1,241 @@
+"""
+Number Challenge engine - numbers and rules of the Number Challenge game.
+Description: Everything here works without pygame zero so levels can be
+played and replayed without a window.
+"""
+
+import random
+from bisect import bisect_left
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from math import comb
+import numpy as np
+
+# Game levels and their number of slots
+LEVELS = {i:j for i,j in zip(range(1,6), range(5, 26, 5))}
+
+# Draws distinct numbers from low to high (both included) in a random order.
+# It is a Fisher-Yates shuffle done lazily: drawing the i-th number swaps a
+# random position of the numbers left with position i, and only the swapped
+# positions are stored, so every draw takes constant time and the range can
+# be much larger than the number of draws
+class NumberSampler:
+    def __init__(self, low=0, high=999, seed=None):
+        self.low = low
+        self.high = high
+        self.random = random.Random(seed)
+        self.reset()
+
+    def __len__(self):
+        """ Returns how many numbers can still be drawn. """
+        return self.high - self.low + 1 - self.drawn
+
+    def reset(self, seed=None):
+        """ Puts every number back. With a seed the same numbers are drawn
+        again in the same order. """
+        if seed is not None:
+            self.random.seed(seed)
+        self.swapped = {} # position: number that was moved there
+        self.drawn = 0
+
+    def draw(self):
+        """ Returns a number that was not drawn since the last reset. """
+        if not len(self):
+            raise ValueError(f'Every number from {self.low} to {self.high} was drawn')
+        i = self.drawn + self.random.randrange(len(self))
+        number = self.swapped.pop(i, i)
+        # The number at the first position left takes the place of the one drawn
+        if i != self.drawn:
+            self.swapped[i] = self.swapped.pop(self.drawn, self.drawn)
+        self.drawn += 1
+        return self.low + number
+
+# Class that manages the list of number: adding numbers, checking the position so 
+# that the list remains ordered
+class ListOfNumbers:
+    def __init__(self, number_of_slots=0):
+        self.number_of_slots = number_of_slots
+        self.empty()
+    
+    def __getitem__(self, slot):
+        """ Returns the number at that slot or an empty string if the slot is
+        empty. """
+        i = bisect_left(self.slots, slot)
+        if i < len(self.slots) and self.slots[i] == slot:
+            return self.values[i]
+        return ''
+    
+    def __len__(self):
+        return self.number_of_slots
+    
+    def add_number(self, num, slot):
+        """ Tries adding the num in the list at the position provided.
+        Returns None if no available slots to put the number.
+        Returns False if there are available slots but slot is 
+        not one of them. Returns True if the number was added successfully  """
+                   
+        available_slots = self.check_available_slots(num)
+        if not available_slots: # if it is empty
+            return None
+        
+        # checks if 'slot' is in the available slots, returns False if not
+        # meaning that the number cannot be at position 'slot' but could
+        # be place elsewhere in the list
+        if slot not in available_slots:
+            return False
+        i = bisect_left(self.values, num)
+        self.values.insert(i, num)
+        self.slots.insert(i, slot)
+        return True
+        
+    def __str__(self):
+        repr = ''
+        for i in range(1, self.number_of_slots + 1):
+            repr += f'{i} : {self[i]}\n' 
+        return repr
+    
+    def check_available_slots(self, num):
+        """ Checks and returns the available slots (the potential slots where
+        the number could be placed in the list) as a range, empty if there
+        are none. The numbers placed are in the same order as their slots, so
+        num goes between the slots of the numbers just below and just above it. """
+        i = bisect_left(self.values, num)
+        if i < len(self.values) and self.values[i] == num:
+            return range(0) # the number is already in the list
+        first = self.slots[i - 1] + 1 if i > 0 else 1
+        last = self.slots[i] - 1 if i < len(self.slots) else self.number_of_slots
+        return range(first, last + 1)
+    
+    def neighbours(self, num):
+        """ Returns the numbers placed just below and just above num, None
+        when there is no such number. """
+        i = bisect_left(self.values, num)
+        below = self.values[i - 1] if i > 0 else None
+        above = self.values[i] if i < len(self.values) else None
+        return below, above
+
+    def gaps(self, low, high):
+        """ Returns (numbers, slots) for every run of empty slots between two
+        placed numbers (or the ends of the list): how many numbers from low to
+        high could still go there and how many slots it has. """
+        values = [low - 1] + self.values + [high + 1]
+        slots = [0] + self.slots + [self.number_of_slots + 1]
+        return [(values[i + 1] - values[i] - 1, slots[i + 1] - slots[i] - 1) for i in range(len(values) - 1)]
+
+    def check_level(self, level):
+        """ Check the level chosen by the user and changes the value of the
+        number_of_slots attribute accordingly. 
+        Updates the content and deletes any previous values.
+        Returns None."""
+
+        self.number_of_slots = LEVELS[level]
+        self.empty()
+
+    def full(self):
+        """ Returns true if the list is full and false otherwise."""
+        return len(self.values) == self.number_of_slots
+    
+    def empty(self):
+        """ Empty the list. The numbers placed are kept sorted with the slot
+        of each one, both lists are in the same order. """
+        self.values = []
+        self.slots = []
+    
+    def __contains__(self, number):
+        i = bisect_left(self.values, number)
+        return i < len(self.values) and self.values[i] == number
+
+############### Win odds ###############
+
+# Exact probability of filling the list when every number goes to the slot
+# with the best odds. The list splits in gaps (the empty slots between two
+# placed numbers and the numbers that can still go there), each gap is played
+# on its own: the list is filled when each gap gets exactly as many of the
+# next numbers as it has slots and each gap is filled. With n numbers and s
+# slots in a gap, weight(n, s) = C(n, s) * P(the gap is filled) and
+#   weight(n, s) = 1/s * sum over r of max over j of weight(r, j) * weight(n - 1 - r, s - 1 - j)
+# (the next number has r numbers below it in the gap and goes to its j-th
+# slot), then P(win) = product of the weights of the gaps / C(N, S) with N
+# and S the numbers and slots of all the gaps.
+# The weights of every gap size for a number of slots (a column) are kept in
+# a bounded LRU cache shared by every turn and every game. Computing the
+# columns of a level takes longer than a frame, it is done in a worker thread.
+# Singleton for each range of numbers so the columns are only computed once.
+class WinOdds:
+    _instances = {}
+
+    def __new__(cls, low=0, high=999, cache_size=64):
+        if (low, high) not in cls._instances:
+            cls._instances[(low, high)] = super().__new__(cls)
+        return cls._instances[(low, high)]
+
+    def __init__(self, low=0, high=999, cache_size=64):
+        if getattr(self, 'columns', None) is not None:
+            return
+        self.low = low
+        self.high = high
+        self.size = high - low + 2 # gap sizes from 0 to high - low + 1
+        self.cache_size = cache_size # number of columns kept
+        self.columns = OrderedDict() # slots: weights of every gap size
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def column(self, slots):
+        """ Returns the weights of the gaps of every size with that number of
+        slots, computing the missing columns. """
+        if slots in self.columns:
+            self.columns.move_to_end(slots)
+            return self.columns[slots]
+        weights = np.zeros(self.size)
+        if slots == 0:
+            weights[:] = 1
+        else:
+            # best[n, r]: best weight when the number has r numbers below it
+            # in a gap of n numbers. The weights of the numbers above it form
+            # a Toeplitz matrix (they only depend on n - 1 - r) that is a view
+            # of one padded array
+            best = np.zeros((self.size, self.size))
+            for j in range(slots):
+                below = self.column(j)
+                above = np.concatenate((np.zeros(self.size), [0], self.column(slots - 1 - j)[:-1]))
+                above = np.lib.stride_tricks.sliding_window_view(above[::-1], self.size)[self.size - 1::-1]
+                np.maximum(best, below * above, out=best)
+            weights = best.sum(axis=1) / slots
+        self.columns[slots] = weights
+        if len(self.columns) > self.cache_size:
+            self.columns.popitem(last=False)
+        return weights
+
+    def ready(self, slots):
+        """ Returns True if the columns up to slots are in the cache. """
+        return all(j in self.columns for j in range(slots + 1))
+
+    def odds(self, numbers, num):
+        """ Returns {slot: probability of filling the list} for every slot
+        where num can be placed in numbers (a ListOfNumbers). """
+        gaps = numbers.gaps(self.low, self.high)
+        slots = numbers.check_available_slots(num)
+        if not slots:
+            return {}
+        # The gap of num and the product of the weights of the others
+        i = bisect_left(numbers.values, num)
+        size, empty = gaps[i]
+        below = num - (numbers.values[i - 1] + 1 if i > 0 else self.low)
+        others = 1.0
+        for k, (n, s) in enumerate(gaps):
+            if k != i:
+                others *= self.column(s)[n]
+        total = comb(sum(n for n, s in gaps) - 1, sum(s for n, s in gaps) - 1)
+        return {slot: others * self.column(j)[below] * self.column(empty - 1 - j)[size - 1 - below] / total
+                for j, slot in enumerate(slots)}
+
+    def request(self, numbers, num):
+        """ Returns a Future whose result is the odds of every slot of num.
+        It is computed right away when the columns needed are in the cache,
+        otherwise in the worker thread. """
+        if self.ready(max(s for n, s in numbers.gaps(self.low, self.high))):
+            future = Future()
+            future.set_result(self.odds(numbers, num))
+            return future
+        board = ListOfNumbers(numbers.number_of_slots)
+        board.values, board.slots = list(numbers.values), list(numbers.slots)
+        return self.executor.submit(self.odds, board, num)
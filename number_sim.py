@@ -0,0 +1,147 @@
+"""
+Number Challenge simulator - plays complete Number Challenge games without
+any display.
+Description: Every game uses the same ListOfNumbers rules and NumberSampler
+draws as the real game, a placement strategy chooses the slot of each
+number. Games are spread over a process pool and the win rate of every
+level is reported with its 95% confidence interval.
+
+Usage: python number_sim.py --games 100000 --strategy all
+"""
+
+import argparse
+import math
+import random
+import time
+from multiprocessing import Pool
+
+from number_engine import ListOfNumbers, NumberSampler, WinOdds, LEVELS
+
+# Placement strategies, they choose the slot of a number among the slots
+# still available for it
+class PlacementStrategy:
+    def __init__(self, low, high, rng):
+        self.low = low # smallest number drawn
+        self.high = high # biggest number drawn
+        self.random = rng
+
+    def choose(self, numbers, num, slots):
+        pass
+
+class RandomStrategy(PlacementStrategy):
+    """ Puts the number in any available slot. """
+    def choose(self, numbers, num, slots):
+        return slots[self.random.randrange(len(slots))]
+
+class ProportionalStrategy(PlacementStrategy):
+    """ Puts the number where it would be if the numbers between its
+    neighbours were spread evenly over the slots between them. """
+    def choose(self, numbers, num, slots):
+        below, above = numbers.neighbours(num)
+        below = self.low - 1 if below is None else below
+        above = self.high + 1 if above is None else above
+        i = (num - below) * len(slots) // (above - below)
+        return slots[min(i, len(slots) - 1)]
+
+class GapStrategy(PlacementStrategy):
+    """ Puts the number where the smallest range of numbers left per empty
+    slot, on its left or on its right, is the largest. """
+    def choose(self, numbers, num, slots):
+        below, above = numbers.neighbours(num)
+        below = self.low - 1 if below is None else below
+        above = self.high + 1 if above is None else above
+
+        def smallest_gap(i):
+            # i empty slots on the left and len(slots) - 1 - i on the right
+            return min((num - below) / (i + 1), (above - num) / (len(slots) - i))
+        return slots[max(range(len(slots)), key=smallest_gap)]
+
+class BestStrategy(PlacementStrategy):
+    """ Puts the number in the slot with the best odds of filling the list,
+    the strategy the odds shown in the game assume. """
+    def __init__(self, low, high, rng):
+        super().__init__(low, high, rng)
+        self.odds = WinOdds(low, high)
+
+    def choose(self, numbers, num, slots):
+        odds = self.odds.odds(numbers, num)
+        return max(slots, key=odds.get)
+
+strategies = {'random': RandomStrategy, 'proportional': ProportionalStrategy, 'gap': GapStrategy, 'best': BestStrategy}
+
+def play(strategy, numbers, sampler):
+    """ Plays one game and returns True if the board was filled. """
+    numbers.empty()
+    while not numbers.full():
+        num = sampler.draw()
+        slots = numbers.check_available_slots(num)
+        if not slots:
+            return False
+        if numbers.add_number(num, strategy.choose(numbers, num, slots)) is not True:
+            raise ValueError(f'The strategy chose a slot not available for {num}')
+    return True
+
+def play_batch(args):
+    """ Plays a batch of games of a level in a worker process and returns
+    (strategy, level, wins, games). The seed makes the batch reproducible
+    whatever worker runs it. """
+    strategy_name, level, games, low, high, seed = args
+    rng = random.Random(seed)
+    strategy = strategies[strategy_name](low, high, rng)
+    numbers = ListOfNumbers(LEVELS[level])
+    sampler = NumberSampler(low, high)
+    wins = 0
+    for _ in range(games):
+        sampler.reset(rng.getrandbits(64))
+        wins += play(strategy, numbers, sampler)
+    return strategy_name, level, wins, games
+
+def simulate(games, strategy_names, levels, low=0, high=999, workers=None, seed=0, batch=2000):
+    """ Plays the games of every strategy and level over a process pool and
+    returns {(strategy, level): (wins, games)} with the time it took. """
+    batches = [(name, level, min(batch, games - start), low, high, f'{seed}-{name}-{level}-{start}')
+               for name in strategy_names for level in levels
+               for start in range(0, games, batch)]
+    results = {(name, level): (0, 0) for name in strategy_names for level in levels}
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for name, level, wins, played in pool.imap_unordered(play_batch, batches):
+            total_wins, total_games = results[name, level]
+            results[name, level] = (total_wins + wins, total_games + played)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def confidence_interval(wins, games, z=1.96):
+    """ Returns the Wilson score interval of a win rate (95% by default). """
+    if not games:
+        return 0.0, 1.0
+    rate = wins / games
+    center = (rate + z * z / (2 * games)) / (1 + z * z / games)
+    half = z * math.sqrt(rate * (1 - rate) / games + z * z / (4 * games * games)) / (1 + z * z / games)
+    return center - half, center + half
+
+def report(results, elapsed):
+    games = sum(played for wins, played in results.values())
+    print(f'{games} games in {elapsed:.2f}s ({games / elapsed:,.0f} games/s)')
+    print(f'  {"strategy":12s} {"level":>5s} {"slots":>5s} {"win rate":>9s}   95% interval')
+    for (name, level), (wins, played) in sorted(results.items()):
+        low, high = confidence_interval(wins, played)
+        print(f'  {name:12s} {level:5d} {LEVELS[level]:5d} {wins / played:9.3%}   [{low:.3%}, {high:.3%}]')
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays Number Challenge games without a display.')
+    parser.add_argument('--games', type=int, default=10000, help='number of games per strategy and level')
+    parser.add_argument('--strategy', choices=sorted(strategies) + ['all'], default='all', help='placement strategy')
+    parser.add_argument('--level', type=int, choices=sorted(LEVELS), action='append', help='level to play (default: all)')
+    parser.add_argument('--max', type=int, default=999, help='biggest number drawn (the smallest is 0)')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the games')
+    args = parser.parse_args()
+
+    names = sorted(strategies) if args.strategy == 'all' else [args.strategy]
+    levels = args.level or sorted(LEVELS)
+    results, elapsed = simulate(args.games, names, levels, 0, args.max, args.workers, args.seed)
+    report(results, elapsed)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,662 @@
+"""
+Snake engine - the snake's body and movements for the Snake game.
+Description: The snake is kept in numpy arrays without any Actor so it can be
+moved and tested without pygame zero, the Actors are only used to draw it.
+"""
+
+import random
+from collections import deque
+
+import numpy as np
+from pygame import Rect
+
+# Size of every part of the snake (the images are 50x50 pixels)
+SIZE = 50
+# Size of the arena
+WIDTH = 600
+HEIGHT = 800
+# Unit vector of each direction
+DIRECTIONS = {'left': (-1, 0), 'right': (1, 0), 'up': (0, -1), 'down': (0, 1)}
+OPPOSITE = {'left': 'right', 'right': 'left', 'up': 'down', 'down': 'up'}
+# Angle of the head's image in each direction (the image looks up)
+HEAD_ANGLES = {'up': 0, 'left': 90, 'down': 180, 'right': 270}
+# Items of the game, the apple makes the snake longer, the bomb shorter
+ITEMS = ('apple', 'bomb')
+
+def headings(positions):
+    """ Returns the direction in which each part after the head is going
+    (towards the part before it), as indexes in DIRECTIONS. """
+    gaps = positions[:-1] - positions[1:]
+    horizontal = np.abs(gaps[:, 0]) >= np.abs(gaps[:, 1])
+    # 0: left, 1: right, 2: up, 3: down
+    return np.where(horizontal, (gaps[:, 0] > 0).astype(int), 2 + (gaps[:, 1] > 0))
+
+def rect_at(pos, size=SIZE):
+    """ Returns the square of the given size centered on pos. """
+    return Rect(pos[0] - size / 2, pos[1] - size / 2, size, size)
+
+# Spatial hash: the arena is cut in square cells and every cell keeps the
+# objects whose rectangle overlaps it, so a query only looks at the objects
+# in the cells it covers instead of every object of the game
+class SpatialGrid:
+    def __init__(self, cell=SIZE):
+        self.cell = cell
+        self.cells = {} # (column, row): set of keys
+        self.rects = {} # key: rectangle
+
+    def __len__(self):
+        return len(self.rects)
+
+    def __contains__(self, key):
+        return key in self.rects
+
+    def covered(self, rect):
+        """ Returns the cells overlapped by rect. """
+        return [(column, row)
+                for column in range(rect.left // self.cell, (rect.right - 1) // self.cell + 1)
+                for row in range(rect.top // self.cell, (rect.bottom - 1) // self.cell + 1)]
+
+    def insert(self, key, rect):
+        self.rects[key] = Rect(rect)
+        for cell in self.covered(rect):
+            self.cells.setdefault(cell, set()).add(key)
+
+    def remove(self, key):
+        for cell in self.covered(self.rects.pop(key)):
+            self.cells[cell].discard(key)
+            if not self.cells[cell]:
+                del self.cells[cell]
+
+    def move(self, key, rect):
+        """ Moves an object, the cells are only updated if it changed cells. """
+        if self.covered(self.rects[key]) == self.covered(rect):
+            self.rects[key] = Rect(rect)
+        else:
+            self.remove(key)
+            self.insert(key, rect)
+
+    def query(self, rect):
+        """ Returns the set of keys of the objects colliding with rect. """
+        found = set()
+        for cell in self.covered(rect):
+            for key in self.cells.get(cell, ()):
+                if key not in found and self.rects[key].colliderect(rect):
+                    found.add(key)
+        return found
+
+# The head leaves a trail of positions (the path) in a ring buffer and every
+# other part of the snake is placed on that path at a fixed distance behind
+# the head, so the body follows the head's turns
+class SnakePlayer:
+    # Distance along the path between the head and the first body part,
+    # between two body parts and between the last body part and the tail
+    neck_gap = 40
+    body_gap = 25
+    tail_gap = 40
+
+    def __init__(self, pos=(300, 300), direction='left', length=3, capacity=256, width=WIDTH, height=HEIGHT):
+        self.width, self.height = width, height # size of the arena
+        self.direction = direction
+        self.moved = direction # direction of the last move
+        self.length = length # number of parts (head and tail included)
+
+        # Every entry of the path is (x, y, distance travelled by the head).
+        # Entries are written twice (at i and i + capacity) so the last
+        # 'capacity' entries are always contiguous in memory
+        self.capacity = capacity
+        self.path = np.zeros((2 * capacity, 3))
+        self.newest = -1 # index of the newest entry
+        self.count = 0 # number of entries written
+        self.distance = 0.0 # distance travelled by the head
+
+        # The snake starts straight, behind its head
+        dx, dy = DIRECTIONS[direction]
+        behind = self.span()
+        self.record(pos[0] - dx * behind, pos[1] - dy * behind, -behind)
+        self.record(pos[0], pos[1], 0.0)
+
+        self.positions = self.place()
+        self.previous = None # positions before the last move
+        self.last_step = 0 # distance covered by the head in the last move
+
+        # Occupancy grid: number of parts far from the head (the only ones the
+        # head can hit) whose center is in each cell. Updated after each move
+        # only for the parts that changed cells
+        self.columns, self.rows = width // SIZE, height // SIZE
+        self.rebuild_occupancy()
+
+    def __len__(self):
+        return self.length
+
+    def head(self):
+        """ Returns the position of the head. """
+        return self.positions[0]
+
+    def tail(self):
+        """ Returns the position of the tail. """
+        return self.positions[-1]
+
+    def body(self):
+        return self.positions[1:-2]
+
+    def head_rect(self):
+        """ Returns the rectangle of the head, used for the collisions. """
+        return rect_at(self.positions[0])
+
+    def cell_indexes(self, positions):
+        """ Returns the index in the occupancy grid of each position. Positions
+        outside of the arena count in the closest cell. """
+        columns = np.clip(positions[:, 0] // SIZE, 0, self.columns - 1).astype(np.intp)
+        rows = np.clip(positions[:, 1] // SIZE, 0, self.rows - 1).astype(np.intp)
+        return rows * self.columns + columns
+
+    def rebuild_occupancy(self):
+        """ Counts again every part in the occupancy grid (when the length
+        changes). """
+        # Parts far enough behind the head along the path to be hit by it,
+        # the closest ones always touch it in the turns
+        self.first_far = int(np.searchsorted(self.offsets(), 2 * SIZE))
+        self.part_cells = self.cell_indexes(self.positions)
+        self.occupancy = np.bincount(self.part_cells[self.first_far:], minlength=self.rows * self.columns)
+
+    def update_occupancy(self):
+        """ Moves the parts that changed cells in the occupancy grid. """
+        cells = self.cell_indexes(self.positions)
+        changed = np.flatnonzero(cells[self.first_far:] != self.part_cells[self.first_far:]) + self.first_far
+        np.subtract.at(self.occupancy, self.part_cells[changed], 1)
+        np.add.at(self.occupancy, cells[changed], 1)
+        self.part_cells = cells
+
+    def span(self):
+        """ Returns the distance along the path between the head and the tail. """
+        return self.neck_gap + self.body_gap * (self.length - 3) + self.tail_gap
+
+    def offsets(self):
+        """ Returns the distance along the path between the head and each
+        part of the snake. """
+        length = self.length
+        offsets = np.empty(length)
+        offsets[0] = 0
+        offsets[1:-1] = self.neck_gap + self.body_gap * np.arange(length - 2)
+        offsets[-1] = offsets[-2] + self.tail_gap
+        return offsets
+
+    def record(self, x, y, distance):
+        """ Adds a position of the head at the end of the path. """
+        self.newest = (self.newest + 1) % self.capacity
+        self.path[self.newest] = self.path[self.newest + self.capacity] = (x, y, distance)
+        self.count += 1
+        self.distance = distance
+
+    def window(self):
+        """ Returns the entries of the path still in the ring buffer, from
+        the oldest to the newest, without copying them. """
+        size = min(self.count, self.capacity)
+        end = self.newest + self.capacity + 1
+        return self.path[end - size:end]
+
+    def grow_path(self):
+        """ Doubles the size of the ring buffer, keeping the current path. """
+        window = self.window().copy()
+        self.capacity *= 2
+        self.path = np.zeros((2 * self.capacity, 3))
+        self.newest = -1
+        self.count = 0
+        for x, y, distance in window:
+            self.record(x, y, distance)
+
+    def place(self):
+        """ Returns the positions of all the parts as a (length, 2) array,
+        found by interpolating the path at their distance from the head. """
+        window = self.window()
+        targets = self.distance - self.offsets()
+        positions = np.empty((self.length, 2))
+        positions[:, 0] = np.interp(targets, window[:, 2], window[:, 0])
+        positions[:, 1] = np.interp(targets, window[:, 2], window[:, 1])
+        return positions
+
+    def swept_rect(self):
+        """ Returns the rectangle covered by the head during the last move.
+        The head moves along one axis so it is exactly the union of its
+        rectangles before and after the move, however fast it goes. """
+        if self.previous is None:
+            return self.head_rect()
+        return rect_at(self.previous[0]).union(self.head_rect())
+
+    def collide_body(self):
+        """ Returns True if the head touched a part of the snake during the
+        last move. Only the parts far enough behind it along the path count
+        (the parts close to the head always touch it in the turns, and the
+        parts on the path the head just went through are in its way). """
+        rect = self.swept_rect()
+        if self.grid_empty(rect):
+            return False
+        start = max(self.first_far, int(np.searchsorted(self.offsets(), 2 * SIZE + self.last_step)))
+        return self.touching(self.positions[start:], rect)
+
+    def touching(self, positions, rect):
+        """ Returns True if one of the parts at these positions overlaps rect. """
+        gaps = np.abs(positions - rect.center)
+        return bool(np.any((gaps[:, 0] < (SIZE + rect.width) / 2) & (gaps[:, 1] < (SIZE + rect.height) / 2)))
+
+    def grid_empty(self, rect):
+        """ Returns True if no part of the occupancy grid can overlap rect:
+        their centers would be in the cells covered by rect grown by half a
+        part on every side. """
+        left = max(int(rect.left - SIZE / 2) // SIZE, 0)
+        right = int(rect.right + SIZE / 2) // SIZE
+        top = max(int(rect.top - SIZE / 2) // SIZE, 0)
+        bottom = int(rect.bottom + SIZE / 2) // SIZE
+        grid = self.occupancy.reshape(self.rows, self.columns)
+        return not grid[top:bottom + 1, left:right + 1].any()
+
+    def turn(self, direction):
+        """ Changes the direction of the snake.
+        Returns False if the snake would turn back on itself: the direction is
+        checked against the last move, not against a turn taken since (two
+        turns before the next move would reverse the snake). """
+        if direction == OPPOSITE[self.moved]:
+            return False
+        self.direction = direction
+        return True
+
+    def collide_wall(self):
+        x, y = self.positions[0]
+        if x >= self.width or x <= 0:
+            return True
+        if y >= self.height or y <= 0:
+            return True
+        return False
+
+    def add(self):
+        """ Makes the snake one part longer, the new part appears on the
+        path behind the last one. """
+        self.length += 1
+        if self.capacity < self.span() / 3 + 2:
+            self.grow_path()
+        self.positions = self.place()
+        self.rebuild_occupancy()
+
+    def remove(self):
+        """ Makes the snake one part shorter. """
+        self.length -= 1
+        self.positions = self.place()
+        self.rebuild_occupancy()
+
+    def move(self, speed):
+        """ Moves the head by 3 + speed pixels in the current direction and
+        places the rest of the snake on the path behind it. """
+        # Keeping the positions before the move to draw the snake in between
+        self.previous = self.positions
+        dx, dy = DIRECTIONS[self.direction]
+        self.moved = self.direction
+        step = 3 + speed
+        self.last_step = step
+        x, y = self.positions[0]
+        self.record(x + dx * step, y + dy * step, self.distance + step)
+
+        # Making sure the path is long enough for the whole snake,
+        # at the slowest speed each entry covers 3 pixels
+        if self.capacity < self.span() / 3 + 2:
+            self.grow_path()
+        self.positions = self.place()
+        self.update_occupancy()
+
+# Set of items with constant time add, discard and random choice: the items
+# are kept in a list and every item knows its index in that list
+class FreeList:
+    def __init__(self, items=()):
+        self.items = []
+        self.index = {}
+        for item in items:
+            self.add(item)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def add(self, item):
+        if item not in self.index:
+            self.index[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        """ Removes an item by moving the last item of the list in its place. """
+        i = self.index.pop(item, None)
+        if i is None:
+            return
+        last = self.items.pop()
+        if i < len(self.items):
+            self.items[i] = last
+            self.index[last] = i
+
+    def choice(self, rng):
+        return self.items[rng.randrange(len(self.items))]
+
+# The items appear on the corners of the arena's cells inside the border
+# (the spots), so an item on a spot overlaps exactly the 4 cells around it
+# and two items on different spots never overlap. A spot is free when none
+# of its 4 cells holds a part of the snake and no item is on it
+class Spawner:
+    def __init__(self, seed=None, width=WIDTH, height=HEIGHT):
+        self.random = random.Random(seed)
+        self.columns, self.rows = width // SIZE, height // SIZE
+        self.parts = np.zeros(self.rows * self.columns, dtype=np.intp) # parts of the snake in each cell
+        self.cells = None # cell of each part at the last sync
+        self.items = {} # name: spot
+        self.taken = np.zeros((self.rows - 1) * (self.columns - 1), dtype=bool) # spots with an item
+        self.blocked = np.zeros(len(self.taken), dtype=bool)
+        self.free = FreeList(range(len(self.blocked)))
+
+    def position(self, spot):
+        """ Returns the position of the center of an item on that spot. """
+        row, column = divmod(spot, self.columns - 1)
+        return (SIZE * (column + 1), SIZE * (row + 1))
+
+    def sync(self, player):
+        """ Updates the free spots after the snake moved, only the parts that
+        changed cells are counted again and only the spots around the cells
+        whose count changed are checked. """
+        cells = player.part_cells
+        if self.cells is None or len(cells) != len(self.cells):
+            # The snake grew or shrank (an item was eaten), it is counted again
+            parts = np.bincount(cells, minlength=self.rows * self.columns)
+            changed = np.flatnonzero(parts != self.parts)
+            self.parts = parts
+        else:
+            moved = np.flatnonzero(cells != self.cells)
+            np.subtract.at(self.parts, self.cells[moved], 1)
+            np.add.at(self.parts, cells[moved], 1)
+            changed = np.concatenate((self.cells[moved], cells[moved]))
+        self.cells = cells
+        # Most steps the head stays in the same cells
+        if len(changed):
+            self.update(self.spots_around(changed))
+
+    def spots_around(self, cells):
+        """ Returns the spots touching the given cells (the 4 corners of each
+        cell that are inside the border). """
+        row, column = np.divmod(np.asarray(cells, dtype=np.intp), self.columns)
+        rows = np.concatenate((row - 1, row - 1, row, row))
+        columns = np.concatenate((column - 1, column, column - 1, column))
+        inside = (rows >= 0) & (rows < self.rows - 1) & (columns >= 0) & (columns < self.columns - 1)
+        return np.unique(rows[inside] * (self.columns - 1) + columns[inside])
+
+    def update(self, spots):
+        """ Checks the given spots again and adds or removes the ones whose
+        state changed in the free list. """
+        row, column = np.divmod(spots, self.columns - 1)
+        grid = self.parts.reshape(self.rows, self.columns)
+        blocked = (grid[row, column] + grid[row, column + 1] + grid[row + 1, column] + grid[row + 1, column + 1]) > 0
+        blocked |= self.taken[spots]
+        changed = blocked != self.blocked[spots]
+        for spot, now in zip(spots[changed].tolist(), blocked[changed].tolist()):
+            if now:
+                self.free.discard(spot)
+            else:
+                self.free.add(spot)
+        self.blocked[spots] = blocked
+
+    def spawn(self, name, player):
+        """ Moves the item called name to a random free spot and returns its
+        position, or None if no spot is free (the item stays where it is). """
+        self.sync(player)
+        if not self.free:
+            return None
+        spots = []
+        if name in self.items:
+            self.taken[self.items[name]] = False
+            spots.append(self.items[name])
+        spot = self.free.choice(self.random)
+        self.items[name] = spot
+        self.taken[spot] = True
+        spots.append(spot)
+        self.update(np.array(spots, dtype=np.intp))
+        return self.position(spot)
+
+# Rules of the Snake game without any display: the snake, the items and the
+# score. The Snake game draws it and bots or the simulator play it directly
+class SnakeWorld:
+    # The speed of the snake is score / speed_divisor pixels per step more
+    # than the slowest speed
+    speed_divisor = 40
+
+    def __init__(self, seed=None, width=WIDTH, height=HEIGHT, apples=1, bombs=1):
+        self.width, self.height = width, height # size of the arena
+        # Free places for the items, the seed makes them reproducible
+        self.spawner = Spawner(seed, width, height)
+        # Spatial hash of the items for the collisions with the head, every
+        # item is named (kind, number): ('apple', 0), ('bomb', 0)...
+        self.items = SpatialGrid()
+        self.respawns = 0 # number of times an item moved
+        self.reset()
+        for kind, count in zip(ITEMS, (apples, bombs)):
+            for number in range(count):
+                name = (kind, number)
+                self.items.insert(name, rect_at((0, 0)))
+                if not self.respawn(name):
+                    self.items.remove(name) # no room left in the arena
+
+    def reset(self):
+        """ Starts a new snake, the items stay where they are. """
+        # The snake starts at the same place as in the 600x800 arena
+        self.player = SnakePlayer((self.width // 2, self.height * 3 // 8), width=self.width, height=self.height)
+        self.score = 0
+        self.lose = False
+        self.cause = None # 'wall', 'body' or 'bomb' when the game is lost
+        self.ticks = 0 # number of steps played
+
+    def names(self, kind):
+        """ Returns the names of the items of a kind. """
+        return [name for name in self.items.rects if name[0] == kind]
+
+    def position(self, name):
+        """ Returns the position of the center of an item. """
+        return self.items.rects[name].center
+
+    def closest(self, kind, pos):
+        """ Returns the position of the item of a kind closest to pos, or
+        None if there is none. Only the items in a square around pos are
+        looked at, the square grows until it holds an item closer than its
+        half side (no item outside can be closer). """
+        def distance(name):
+            x, y = self.position(name)
+            return abs(x - pos[0]) + abs(y - pos[1]), name
+
+        reach = 2 * SIZE
+        # Once the square covers more cells than there are items, looking at
+        # every item is faster
+        while (2 * reach // self.items.cell) ** 2 <= len(self.items):
+            names = [name for name in self.items.query(rect_at(pos, 2 * reach)) if name[0] == kind]
+            if names:
+                best = min(names, key=distance)
+                if distance(best)[0] <= reach:
+                    return self.position(best)
+            reach *= 2
+        names = self.names(kind)
+        return self.position(min(names, key=distance)) if names else None
+
+    def respawn(self, name):
+        """ Moves an item to a random free place where it does not overlap
+        the snake or the other items. Returns False if there is no room. """
+        pos = self.spawner.spawn(name, self.player)
+        if pos is None:
+            return False # the snake fills the arena, the item stays where it is
+        self.items.move(name, rect_at(pos))
+        self.respawns += 1
+        return True
+
+    def die(self, cause):
+        if not self.lose:
+            self.lose = True
+            self.cause = cause
+
+    def step(self):
+        """ Moves the game forward by one step. """
+        # Items touched by the head during its last move (even the ones it
+        # went past at high speed), in a fixed order so seeded games replay
+        # the same way
+        for name in sorted(self.items.query(self.player.swept_rect())):
+            kind = name[0]
+            # If snake head touches apple, increase score
+            if kind == 'apple':
+                self.respawn(name)
+                self.score += 10
+                # Increase the lenght of the body of the snake
+                self.player.add()
+
+            # if snahead touches a bomb
+            elif kind == 'bomb':
+                if len(self.player.body()) > 1:
+                    self.respawn(name)
+                    self.player.remove() # decrease the lenght of the body of the snake
+                else:
+                    # Loses if the body of the snake is too short
+                    self.die('bomb')
+
+        # if the snake's head hits its body or the wall, the player loses
+        if self.player.collide_body():
+            self.die('body')
+        elif self.player.collide_wall():
+            self.die('wall')
+
+        # Increases the speed proportionally to the player's score
+        self.player.move(self.score / self.speed_divisor)
+        self.spawner.sync(self.player)
+        self.ticks += 1
+
+# Bots, they choose the direction of the snake before each step (for the
+# simulator and the game's stress test)
+class SnakeBot:
+    # Distance ahead of the head checked before going in a direction, by
+    # steps of half a part
+    look = 2 * SIZE
+    # Distance the snake goes straight after a turn, unless it is in danger:
+    # turning more often folds the body so tight the head touches it
+    straight = SIZE
+
+    def __init__(self, world):
+        self.world = world
+        self.turned_at = 0 # distance travelled by the head at the last turn
+
+    def options(self):
+        """ Returns the directions the snake can take without dying in the
+        next steps, the snake can't turn back on itself. """
+        player = self.world.player
+        return [direction for direction in DIRECTIONS
+                if direction != OPPOSITE[player.direction] and self.safe(direction)]
+
+    def safe(self, direction):
+        player = self.world.player
+        dx, dy = DIRECTIONS[direction]
+        head_x, head_y = player.head()
+        for distance in range(SIZE // 2, self.look + 1, SIZE // 2):
+            x, y = head_x + dx * distance, head_y + dy * distance
+            # Only the wall right in front matters, the snake can still turn
+            # along a wall further away
+            if distance == SIZE // 2 and (x <= 0 or x >= self.world.width or y <= 0 or y >= self.world.height):
+                return False
+            rect = rect_at((x, y))
+            if player.touching(player.positions[player.first_far:], rect):
+                return False
+            if any(name[0] == 'bomb' for name in self.world.items.query(rect)):
+                return False
+        return True
+
+    def closest(self, options):
+        """ Returns the direction bringing the head the closest to the apple,
+        keeping the current direction when it is as good. """
+        player = self.world.player
+        x, y = player.head()
+        apple = self.world.closest('apple', (x, y))
+        if apple is None:
+            return options[0]
+        apple_x, apple_y = apple
+
+        def distance(direction):
+            dx, dy = DIRECTIONS[direction]
+            return (abs(x + dx * self.look - apple_x) + abs(y + dy * self.look - apple_y),
+                    direction != player.direction)
+        return min(options, key=distance)
+
+    def choose(self):
+        """ Returns the direction the snake should take. """
+        player = self.world.player
+        if player.distance - self.turned_at < self.straight and self.safe(player.direction):
+            return player.direction
+        direction = self.next_direction()
+        if direction is not None and direction != player.direction:
+            self.turned_at = player.distance
+        return direction
+
+    def next_direction(self):
+        pass
+
+class GreedyBot(SnakeBot):
+    """ Goes in the safe direction that brings the head the closest to the apple. """
+    def next_direction(self):
+        options = self.options()
+        if options:
+            return self.closest(options)
+        return None
+
+class PathBot(SnakeBot):
+    """ Follows the shortest path to the apple on the grid of the arena's
+    cells, around the body and the bomb (breadth-first search). The path is
+    only searched again when the head changes cells or the apple moves. """
+    def __init__(self, world):
+        super().__init__(world)
+        self.plan = None # (head cell, items moves, length): direction
+
+    def cells(self, kind):
+        """ Returns the cells covered by the items of a kind. """
+        player = self.world.player
+        return {row * player.columns + column
+                for name in self.world.names(kind)
+                for column, row in self.world.items.covered(self.world.items.rects[name])
+                if 0 <= column < player.columns and 0 <= row < player.rows}
+
+    def search(self):
+        """ Returns the first direction of the shortest path from the head to
+        the apple or None if there is no path. """
+        player = self.world.player
+        columns, rows = player.columns, player.rows
+        start = int(player.part_cells[0])
+        targets = self.cells('apple')
+        blocked = set(player.part_cells[player.first_far:].tolist()) | self.cells('bomb')
+        first = {start: None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            if cell in targets:
+                return first[cell]
+            row, column = divmod(cell, columns)
+            for direction, (dx, dy) in DIRECTIONS.items():
+                if cell == start and direction == OPPOSITE[player.direction]:
+                    continue
+                if not (0 <= column + dx < columns and 0 <= row + dy < rows):
+                    continue
+                neighbour = cell + dy * columns + dx
+                if neighbour in first or neighbour in blocked:
+                    continue
+                first[neighbour] = direction if cell == start else first[cell]
+                queue.append(neighbour)
+        return None
+
+    def next_direction(self):
+        player = self.world.player
+        key = (int(player.part_cells[0]), self.world.respawns, len(player))
+        if self.plan is None or self.plan[0] != key:
+            self.plan = (key, self.search())
+        direction = self.plan[1]
+        if direction is not None and (direction == player.direction or self.safe(direction)):
+            return direction
+        # No path or the path is not safe right now
+        options = self.options()
+        if options:
+            return self.closest(options)
+        return None
+
+bots = {'greedy': GreedyBot, 'path': PathBot}
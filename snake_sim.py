@@ -0,0 +1,76 @@
+"""
+Snake simulator - bots playing complete Snake games without any display.
+Description: The bots only choose the direction of the snake, every game goes
+through the same SnakeWorld as the real game so the scores and the causes of
+death match what a player would get. Games are spread over a process pool.
+
+Usage: python snake_sim.py --games 200 --bot path
+"""
+
+import argparse
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+from snake_engine import SnakeWorld, bots
+
+def play(bot_name, seed, max_ticks, speed_divisor=SnakeWorld.speed_divisor):
+    """ Plays one game and returns (score, ticks, cause of death), the cause
+    is 'timeout' if the game lasted max_ticks steps. """
+    world = SnakeWorld(seed)
+    world.speed_divisor = speed_divisor
+    bot = bots[bot_name](world)
+    while not world.lose and world.ticks < max_ticks:
+        direction = bot.choose()
+        if direction is not None and direction != world.player.direction:
+            world.player.turn(direction)
+        world.step()
+    return world.score, world.ticks, world.cause or 'timeout'
+
+def play_batch(args):
+    """ Plays a batch of games in a worker process, game i uses the seed i so
+    the results do not depend on the worker running it. """
+    bot_name, seeds, max_ticks, speed_divisor = args
+    return [play(bot_name, seed, max_ticks, speed_divisor) for seed in seeds]
+
+def simulate(games, bot_name, workers=None, seed=0, max_ticks=20000,
+             speed_divisor=SnakeWorld.speed_divisor, batch=10):
+    """ Plays the games over a process pool and returns the list of the
+    results with the time it took. """
+    batches = [(bot_name, range(seed + start, seed + min(start + batch, games)), max_ticks, speed_divisor)
+               for start in range(0, games, batch)]
+    results = []
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for batch_results in pool.imap_unordered(play_batch, batches):
+            results.extend(batch_results)
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def report(results, elapsed):
+    games = len(results)
+    ticks = sum(result[1] for result in results)
+    scores = [result[0] for result in results]
+    print(f'{games} games in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s)')
+    print(f'  average score: {sum(scores) / games:.1f}  best: {max(scores)}')
+    print(f'  average length of a game: {ticks / games:.0f} ticks')
+    causes = Counter(result[2] for result in results)
+    for cause in ('wall', 'body', 'bomb', 'timeout'):
+        print(f'  {cause:8s} {causes[cause]:6d}  {causes[cause] / games:6.1%}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays Snake games with bots without a display.')
+    parser.add_argument('--games', type=int, default=100, help='number of games to play')
+    parser.add_argument('--bot', choices=sorted(bots), default='path', help='bot playing the games')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--max-ticks', type=int, default=20000, help='steps before a game is stopped')
+    parser.add_argument('--speed-divisor', type=float, default=SnakeWorld.speed_divisor,
+                        help='the snake goes score / speed-divisor pixels per step faster')
+    args = parser.parse_args()
+
+    results, elapsed = simulate(args.games, args.bot, args.workers, args.seed, args.max_ticks, args.speed_divisor)
+    report(results, elapsed)
+
+if __name__ == '__main__':
+    main()
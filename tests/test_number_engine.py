@@ -0,0 +1,148 @@
+"""
+Regression checks of the Number Challenge: NumberSampler must draw every
+number once, the rules of ListOfNumbers must match a plain list of slots,
+and WinOdds.odds() must give the same
+probabilities as an exhaustive search of the best play on small ranges of
+numbers.
+"""
+
+import os
+import random
+import sys
+from functools import lru_cache
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from number_engine import ListOfNumbers, NumberSampler, WinOdds
+
+def test_sampler_draws_every_number_once():
+    for low, high in [(0, 0), (0, 9), (5, 104)]:
+        sampler = NumberSampler(low, high, seed=1)
+        drawn = [sampler.draw() for i in range(high - low + 1)]
+        assert sorted(drawn) == list(range(low, high + 1))
+        assert len(sampler) == 0
+        with pytest.raises(ValueError):
+            sampler.draw()
+
+def test_sampler_large_range():
+    """ A few draws from a large range are distinct and in the range. """
+    sampler = NumberSampler(0, 10 ** 9, seed=2)
+    drawn = [sampler.draw() for i in range(1000)]
+    assert len(set(drawn)) == 1000 and all(0 <= number <= 10 ** 9 for number in drawn)
+    assert len(sampler) == 10 ** 9 + 1 - 1000
+
+def test_sampler_reset():
+    sampler = NumberSampler(0, 999, seed=3)
+    first = [sampler.draw() for i in range(50)]
+    sampler.reset(3)
+    assert [sampler.draw() for i in range(50)] == first
+    assert len(sampler) == 950
+    # Without a seed the numbers are put back but drawn in another order
+    sampler.reset()
+    again = [sampler.draw() for i in range(1000)]
+    assert sorted(again) == list(range(1000))
+
+class ReferenceList:
+    """ The rules on a plain list of slots: a number can go in an empty slot
+    when every number before it is smaller and every number after it is
+    larger. """
+    def __init__(self, number_of_slots):
+        self.content = {slot: '' for slot in range(1, number_of_slots + 1)}
+
+    def available_slots(self, num):
+        if num in self.content.values():
+            return []
+        numbers = [(slot, value) for slot, value in self.content.items() if value != '']
+        return [slot for slot, value in self.content.items() if value == ''
+                and all(other < num for other_slot, other in numbers if other_slot < slot)
+                and all(other > num for other_slot, other in numbers if other_slot > slot)]
+
+    def add_number(self, num, slot):
+        slots = self.available_slots(num)
+        if not slots:
+            return None
+        if slot not in slots:
+            return False
+        self.content[slot] = num
+        return True
+
+def test_list_rules():
+    """ Random games on random boards: every answer of ListOfNumbers is the
+    one of the reference, wrong slots included. """
+    rng = random.Random(0)
+    for game in range(500):
+        number_of_slots = rng.choice([1, 2, 5, 10, 25])
+        numbers = ListOfNumbers(number_of_slots)
+        reference = ReferenceList(number_of_slots)
+        for turn in range(2 * number_of_slots):
+            num = rng.randrange(0, 3 * number_of_slots)
+            assert list(numbers.check_available_slots(num)) == reference.available_slots(num)
+            slot = rng.randrange(0, number_of_slots + 2) # wrong slots are tried too
+            assert numbers.add_number(num, slot) == reference.add_number(num, slot)
+            for i in range(1, number_of_slots + 1):
+                assert numbers[i] == reference.content[i] # '' for the empty slots
+            assert numbers.full() == all(value != '' for value in reference.content.values())
+            assert (num in numbers) == (num in reference.content.values())
+            assert len(numbers) == number_of_slots
+
+def test_list_empty():
+    numbers = ListOfNumbers(5)
+    assert [numbers[slot] for slot in range(1, 6)] == [''] * 5
+    assert not numbers.full() and 3 not in numbers
+    for slot, num in enumerate([10, 20, 30, 40, 50], start=1):
+        assert numbers.add_number(num, slot)
+    assert numbers.full() and 30 in numbers and 35 not in numbers
+    assert numbers.add_number(35, 3) is None # no slot left
+    numbers.check_level(2)
+    assert len(numbers) == 10 and not numbers.full() and 30 not in numbers
+
+# (lowest number, highest number, number of slots)
+RANGES = [(0, 7, 3), (0, 9, 4), (0, 11, 4)]
+
+def placed(number_of_slots, values, slots):
+    numbers = ListOfNumbers(number_of_slots)
+    for value, slot in zip(values, slots):
+        numbers.add_number(value, slot)
+    return numbers
+
+def brute_force(low, high, number_of_slots):
+    """ Returns a function giving the probability of filling the list from a
+    position (placed values, their slots) when every next number, drawn
+    without replacement, goes in the slot with the best odds. """
+    @lru_cache(maxsize=None)
+    def win(values, slots):
+        numbers = placed(number_of_slots, values, slots)
+        if numbers.full():
+            return 1.0
+        left = [num for num in range(low, high + 1) if num not in numbers]
+        total = 0
+        for num in left:
+            total += max((win(*after(values, slots, num, slot))
+                          for slot in numbers.check_available_slots(num)), default=0)
+        return total / len(left)
+
+    def after(values, slots, num, slot):
+        numbers = placed(number_of_slots, values, slots)
+        numbers.add_number(num, slot)
+        return tuple(numbers.values), tuple(numbers.slots)
+    return win, after
+
+def check(low, high, number_of_slots, values=(), slots=()):
+    win, after = brute_force(low, high, number_of_slots)
+    odds = WinOdds(low, high)
+    numbers = placed(number_of_slots, values, slots)
+    for num in range(low, high + 1):
+        if num in numbers:
+            continue
+        for slot, probability in odds.odds(numbers, num).items():
+            assert abs(probability - win(*after(tuple(values), tuple(slots), num, slot))) < 1e-12, (num, slot)
+
+def test_empty_list():
+    for low, high, number_of_slots in RANGES:
+        check(low, high, number_of_slots)
+
+def test_started_list():
+    for low, high, number_of_slots in RANGES:
+        check(low, high, number_of_slots, values=[low + 3], slots=[2])
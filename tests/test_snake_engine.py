@@ -0,0 +1,68 @@
+"""
+Regression checks of the Snake engine: the snake's turns and the free
+spots of the spawner.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snake_engine import SnakeWorld, GreedyBot
+
+def test_no_reverse_between_moves():
+    """ Two turns before the next move must not reverse the snake. """
+    world = SnakeWorld(0)
+    player = world.player
+    for i in range(30):
+        world.step()
+    x, y = player.head()
+    assert player.turn('up')
+    assert not player.turn('right') # opposite of the last move (left)
+    assert player.direction == 'up'
+    for i in range(60):
+        world.step()
+    head_x, head_y = player.head()
+    assert head_x == x and head_y < y
+
+def test_turn_after_move():
+    """ The opposite of a turn is allowed once the snake moved that way. """
+    world = SnakeWorld(0)
+    player = world.player
+    assert player.turn('up')
+    world.step()
+    assert not player.turn('down')
+    assert player.turn('right')
+
+def free_spots(world):
+    """ Returns the free spots computed from scratch: no part of the snake in
+    the 4 cells around the spot and no item on it. """
+    spawner = world.spawner
+    parts = np.bincount(world.player.part_cells, minlength=spawner.rows * spawner.columns)
+    grid = parts.reshape(spawner.rows, spawner.columns)
+    blocked = (grid[:-1, :-1] + grid[:-1, 1:] + grid[1:, :-1] + grid[1:, 1:]).ravel() > 0
+    blocked[list(spawner.items.values())] = True
+    return set(np.flatnonzero(~blocked).tolist())
+
+def test_free_spots():
+    """ The free spots updated after each step match the ones computed
+    from scratch, in bot games that grow, shrink and lose the snake (a new
+    snake starts then, like in the stress test). """
+    for seed, (width, height, apples, bombs) in enumerate([(600, 800, 1, 1), (600, 800, 10, 10),
+                                                           (1500, 1500, 40, 40)]):
+        world = SnakeWorld(seed, width, height, apples, bombs)
+        bot = GreedyBot(world)
+        for step in range(2000):
+            direction = bot.choose()
+            if direction is not None and direction != world.player.direction:
+                world.player.turn(direction)
+            world.step()
+            if world.lose:
+                world.reset()
+                bot = GreedyBot(world)
+                continue
+            free = world.spawner.free
+            assert set(free.items) == free_spots(world), (seed, step)
+            assert all(free.items[i] == item for item, i in free.index.items())
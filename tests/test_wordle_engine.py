@@ -0,0 +1,89 @@
+"""
+Regression checks of the Wordle engine: WordList must find exactly its
+words, and score() must give the same patterns as the usual two pass
+scoring, repeated letters included.
+"""
+
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wordle_engine
+from wordle_engine import WordList, score, letters, encode, decode
+
+def random_words(rng, count, length):
+    words = {''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for i in range(length)) for j in range(count)}
+    return sorted(words)
+
+def check_word_list(words, foreign, length):
+    word_list = WordList([word.encode('ascii') for word in words], length)
+    assert len(word_list) == len(words) and list(word_list) == words
+    for index, word in enumerate(words):
+        assert word_list.index(word) == index
+        assert word_list.index(word.encode('ascii')) == index
+        assert word in word_list
+    for word in foreign:
+        assert word_list.index(word) == -1 and word not in word_list
+
+def test_word_list():
+    rng = random.Random(0)
+    for length, count in [(4, 10), (5, 3000), (8, 500)]:
+        words = random_words(rng, 2 * count, length)
+        # Half of the words are stored, the others must not be found
+        stored, foreign = words[::2], words[1::2]
+        check_word_list(stored, foreign + ['a' * (length - 1), 'a' * (length + 1), 'é' + 'a' * (length - 1), ''],
+                        length)
+    check_word_list([], ['hello'], 5)
+
+def test_word_list_collisions(monkeypatch):
+    """ Every word has the same hash: the index still finds each word by
+    probing and stops at the first empty slot for the others. """
+    monkeypatch.setattr(wordle_engine, 'crc32', lambda data: 12345)
+    words = random_words(random.Random(1), 200, 5)
+    check_word_list(words[::2], words[1::2], 5)
+
+def reference(guess, answer):
+    """ Two pass Wordle scoring: greens first, then a letter is yellow as
+    many times as it is left unmatched in the answer. """
+    states = [0] * len(guess)
+    left = {}
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            states[i] = 2
+        else:
+            left[a] = left.get(a, 0) + 1
+    for i, g in enumerate(guess):
+        if states[i] != 2 and left.get(g, 0):
+            states[i] = 1
+            left[g] -= 1
+    return encode(states)
+
+def test_repeated_letters():
+    # Only one of the two e's of speed is in abide, the green e and the
+    # yellow e of eerie use up both e's of elder, the greens of lolly use up
+    # both l's of hello
+    assert decode(score(letters('speed'), letters('abide'))[0]) == [0, 0, 1, 0, 1]
+    assert decode(score(letters('eerie'), letters('elder'))[0]) == [2, 1, 1, 0, 0]
+    assert decode(score(letters('lolly'), letters('hello'))[0]) == [0, 1, 2, 2, 0]
+
+def test_matches_reference():
+    rng = random.Random(0)
+    for length in (4, 5, 6, 8):
+        # A small alphabet gives many repeated letters
+        words = [''.join(rng.choice('abcde') for _ in range(length)) for _ in range(60)]
+        patterns = score(letters(words, length)[:, None], letters(words, length)[None, :])
+        expected = np.array([[reference(guess, answer) for answer in words] for guess in words])
+        assert (patterns == expected).all()
+
+def test_broadcasting():
+    words = ['crane', 'eerie', 'abide', 'speed', 'hello']
+    codes = letters(words)
+    table = score(codes[:, None], codes[None, :])
+    assert table.shape == (5, 5)
+    for i in range(5):
+        assert (score(codes[i], codes) == table[i]).all()
+        assert (score(codes, codes[i]) == table[:, i]).all()
@@ -0,0 +1,511 @@
+"""
+Wordle engine - word lists and game rules shared by the Wordle game.
+Description: Everything here works without pygame zero so it can be loaded
+once per process and reused by every Wordle round.
+"""
+
+from random import randint
+from array import array
+from zlib import crc32
+from hashlib import sha1
+import glob
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+WORD_LENGTH = 5 # Default length of the words
+LENGTHS = range(4, 9) # Lengths that can be played when their dictionaries exist
+# Changing the way a cached table is computed must change this number
+# so the tables saved by older versions are rebuilt
+CACHE_VERSION = 1
+
+# Packed list of fixed-width words with a hash index
+class WordList:
+    def __init__(self, words, length=WORD_LENGTH):
+        """ Stores the words (bytes of the same length) back to back in a
+        single bytes object and builds an open-addressing hash index
+        on top of it. """
+        self.length = length
+        self.records = b''.join(words)
+        self.size = len(words)
+
+        # Keeping the table at most half full so probes stay short
+        capacity = 1
+        while capacity < 2 * self.size:
+            capacity *= 2
+        self.mask = capacity - 1
+        self.slots = array('i', [-1]) * capacity
+        for index in range(self.size):
+            slot = crc32(self.record(index)) & self.mask
+            while self.slots[slot] != -1:
+                slot = (slot + 1) & self.mask
+            self.slots[slot] = index
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        return self.record(index).decode('ascii')
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+    def __contains__(self, word):
+        return self.index(word) != -1
+
+    def record(self, index):
+        """ Returns the raw bytes of the word stored at index. """
+        start = index * self.length
+        return self.records[start:start + self.length]
+
+    def index(self, word):
+        """ Returns the position of the word in the list or -1 if the
+        word is not in it. """
+        if isinstance(word, str):
+            if not word.isascii():
+                return -1
+            word = word.encode('ascii')
+        if len(word) != self.length:
+            return -1
+
+        slot = crc32(word) & self.mask
+        while self.slots[slot] != -1:
+            if self.record(self.slots[slot]) == word:
+                return self.slots[slot]
+            slot = (slot + 1) & self.mask
+        return -1
+
+# Precomputed tables saved as .npy files next to the dictionaries. The name of
+# each file contains a hash of the dictionaries so changing a dictionary
+# rebuilds the tables. The files are memory-mapped: loading takes milliseconds
+# and the processes using the same file share its pages.
+class TableCache:
+    def __init__(self, directory, key, prefix='wordle'):
+        self.directory = directory
+        self.key = key
+        self.prefix = prefix
+
+    def path(self, name):
+        return os.path.join(self.directory, f'{self.prefix}_{name}.{self.key}.npy')
+
+    def find(self, name):
+        """ Returns the table saved under name (memory-mapped, read only)
+        or None if it was not built yet. """
+        try:
+            return np.load(self.path(name), mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+
+    def load(self, name, build):
+        """ Returns the table saved under name, calling build() to compute
+        and save it if needed. """
+        table = self.find(name)
+        if table is not None:
+            return table
+        table = build()
+        try:
+            self.save(name, table)
+        except OSError:
+            return table # read-only folder: the table stays in memory
+        mapped = self.find(name)
+        return mapped if mapped is not None else table
+
+    def save(self, name, table):
+        """ Saves the table and deletes the ones built from older
+        dictionaries. """
+        path = self.path(name)
+        # Writing to a temporary file first so another process never
+        # maps a half written table
+        temporary = f'{path}.{os.getpid()}.tmp'
+        with open(temporary, 'wb') as file:
+            np.save(file, np.ascontiguousarray(table))
+        os.replace(temporary, path)
+
+        for old in glob.glob(os.path.join(glob.escape(self.directory), f'{self.prefix}_{name}.*.npy')):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+# Both Wordle dictionaries for one word length. Each length is a separate
+# shard (its own pair of files) loaded the first time that length is played,
+# then shared using the Singleton pattern (one instance per length)
+class Lexicon:
+    _instances = {}
+    # Bundles (see asset_bundle) the dictionaries of a folder are read from
+    # instead of its files: {directory: bundle}
+    bundles = {}
+
+    def __new__(cls, length=WORD_LENGTH, directory=''):
+        if (length, directory) not in cls._instances:
+            cls._instances[(length, directory)] = super().__new__(cls)
+        return cls._instances[(length, directory)]
+
+    def __init__(self, length=WORD_LENGTH, directory=''):
+        # The files are only read the first time the lexicon is created
+        if getattr(self, 'valid', None) is not None:
+            return
+        self.length = length
+        valid_file, answers_file = self.files(length, directory)
+        digest = sha1(f'{CACHE_VERSION}'.encode('ascii'))
+        answers = self.read_words(self.read(answers_file, directory), digest, length)
+        valid = self.read_words(self.read(valid_file, directory), digest, length)
+        # Every answer has to be accepted as a guess
+        known = set(valid)
+        valid += [word for word in answers if word not in known]
+
+        # dictionary of all the words accepted as a guess
+        self.valid = WordList(valid, length)
+        # smaller dictionary where the words to find are selected
+        self.answers = WordList(answers, length)
+        # Precomputed tables for these dictionaries
+        directory = os.path.dirname(os.path.abspath(valid_file))
+        self.cache = TableCache(directory, digest.hexdigest()[:16], f'wordle{length}')
+
+    @staticmethod
+    def files(length, directory=''):
+        """ Returns the paths of the dictionary of valid words and of the
+        dictionary of answers for the given length. """
+        if length == WORD_LENGTH:
+            return os.path.join(directory, 'wordle_dico.txt'), os.path.join(directory, 'dico.txt')
+        return os.path.join(directory, f'wordle_dico_{length}.txt'), os.path.join(directory, f'dico_{length}.txt')
+
+    @classmethod
+    def lengths(cls, directory=''):
+        """ Returns the word lengths that have both dictionaries, without
+        loading any of them. """
+        bundle = cls.bundles.get(directory)
+        return [length for length in LENGTHS
+                if all((bundle is not None and os.path.basename(file) in bundle) or os.path.exists(file)
+                       for file in cls.files(length, directory))]
+
+    @classmethod
+    def read(cls, file, directory=''):
+        """ Returns the content of a dictionary file, from the bundle of the
+        folder if it has the file (and the file did not change since, with
+        ASSET_BUNDLE_CHECK=1). """
+        bundle = cls.bundles.get(directory)
+        name = os.path.basename(file)
+        if bundle is not None and name in bundle and bundle.current(name):
+            return bundle.read(name)
+        with open(file, 'rb') as dico:
+            return dico.read()
+
+    @staticmethod
+    def read_words(content, digest=None, length=WORD_LENGTH):
+        """ Returns the words of the content of a dictionary file as a list
+        of lowercase bytes without duplicates. Lines that are not a word of
+        the right length are ignored. The content of the file is added to
+        the digest if one is given. """
+        words = []
+        seen = set()
+        if digest is not None:
+            digest.update(content)
+        for line in content.splitlines():
+            word = line.strip().lower()
+            if len(word) == length and word.isalpha() and word not in seen:
+                seen.add(word)
+                words.append(word)
+        return words
+
+    def contains(self, word):
+        """ Returns True if the word is accepted as a guess. """
+        return word in self.valid
+
+    def random_answer(self):
+        """ Returns a random word to find. """
+        return self.answers[randint(0, len(self.answers) - 1)]
+
+############### Feedback patterns ###############
+
+# A feedback pattern is stored as a single number in base 3: the state of the
+# letter at position i (0 grey, 1 yellow, 2 green) is multiplied by 3 ** i.
+# With 5 letters the biggest pattern is 242 so it fits in a uint8, longer
+# words need a uint16.
+
+def pattern_type(length):
+    """ Returns the smallest numpy type holding every pattern of a word of
+    the given length. """
+    return np.uint8 if 3 ** length <= 256 else np.uint16
+
+def letters(words, length=WORD_LENGTH):
+    """ Returns the words as a (number of words, length) uint8 array of
+    letter codes. Accepts a WordList, a single word or a list of words. """
+    if isinstance(words, WordList):
+        records = words.records
+        length = words.length
+    elif isinstance(words, str):
+        records = words.encode('ascii')
+        length = len(words)
+    else:
+        records = b''.join(w.encode('ascii') if isinstance(w, str) else w for w in words)
+    return np.frombuffer(records, dtype=np.uint8).reshape(-1, length)
+
+def score(guesses, answers):
+    """ Returns the feedback pattern of every guess against its answer.
+    Both arguments are arrays of letter codes (see letters()) and follow the
+    numpy broadcasting rules on every axis but the last one, so
+    score(guesses[:, None], answers[None, :]) gives the patterns of all the
+    (guess, answer) pairs. """
+    guesses = np.asarray(guesses, dtype=np.uint8)
+    answers = np.asarray(answers, dtype=np.uint8)
+    guesses, answers = np.broadcast_arrays(guesses, answers)
+    length = guesses.shape[-1]
+
+    green = guesses == answers
+    patterns = np.zeros(guesses.shape[:-1], dtype=pattern_type(length))
+    for i in range(length):
+        letter = guesses[..., i, None]
+        # Letters of the answer that are not already matched by a green
+        available = ((answers == letter) & ~green).sum(axis=-1)
+        # Earlier misplaced copies of the same letter use them up first
+        used = ((guesses[..., :i] == letter) & ~green[..., :i]).sum(axis=-1)
+        yellow = ~green[..., i] & (used < available)
+        patterns += (2 * green[..., i] + yellow).astype(patterns.dtype) * 3 ** i
+    return patterns
+
+def decode(pattern, length=WORD_LENGTH):
+    """ Turns a pattern back into the list of letter states. """
+    pattern = int(pattern)
+    states = []
+    for i in range(length):
+        states.append(pattern % 3)
+        pattern //= 3
+    return states
+
+# Patterns of every (valid word, answer) pair of a lexicon, shared by every
+# game using the Singleton pattern (one instance per lexicon)
+class FeedbackTable:
+    _instances = {}
+    # Number of guesses scored at once when building the matrix,
+    # bounds the size of the temporary arrays
+    chunk = 1024
+
+    def __new__(cls, lexicon=None):
+        lexicon = lexicon if lexicon is not None else Lexicon()
+        if lexicon not in cls._instances:
+            cls._instances[lexicon] = super().__new__(cls)
+        return cls._instances[lexicon]
+
+    def __init__(self, lexicon=None):
+        if getattr(self, 'lexicon', None) is not None:
+            return
+        self.lexicon = lexicon if lexicon is not None else Lexicon()
+        self.guess_letters = letters(self.lexicon.valid)
+        self.answer_letters = letters(self.lexicon.answers)
+        # Row of the matrix of each answer
+        self.answer_rows = np.array([self.lexicon.valid.index(word) for word in self.lexicon.answers])
+        # Mapping the matrix if a previous launch already saved it
+        self._matrix = self.lexicon.cache.find('feedback')
+        self.lock = threading.Lock() # the matrix is built by one thread only
+
+    @property
+    def matrix(self):
+        """ Matrix of patterns with one row per valid word and one column per
+        answer. Built (and saved in the cache) the first time it is needed. """
+        with self.lock:
+            if self._matrix is None:
+                self._matrix = self.lexicon.cache.load('feedback', self.build)
+        return self._matrix
+
+    @property
+    def ready(self):
+        return self._matrix is not None
+
+    def build(self):
+        """ Computes and returns the feedback matrix. """
+        matrix = np.empty((len(self.guess_letters), len(self.answer_letters)), dtype=pattern_type(self.lexicon.length))
+        answers = self.answer_letters[None, :, :]
+        for start in range(0, len(self.guess_letters), self.chunk):
+            guesses = self.guess_letters[start:start + self.chunk, None, :]
+            matrix[start:start + self.chunk] = score(guesses, answers)
+        return matrix
+
+    def pattern(self, guess, answer):
+        """ Returns the pattern of guess against answer. Uses the matrix when
+        it has been built and both words are in the lexicon. """
+        if self._matrix is not None:
+            row = self.lexicon.valid.index(guess)
+            column = self.lexicon.answers.index(answer)
+            if row != -1 and column != -1:
+                return int(self._matrix[row, column])
+        return int(score(letters(guess), letters(answer))[0])
+
+def encode(states):
+    """ Turns a list of letter states into a pattern. """
+    pattern = 0
+    for i, state in enumerate(states):
+        pattern += state * 3 ** i
+    return pattern
+
+############### Candidates ###############
+
+# Answers still consistent with every hint given so far, kept as a boolean
+# mask over the answers of the lexicon and narrowed after each guess
+class CandidateSet:
+    def __init__(self, feedback):
+        self.feedback = feedback
+        self.mask = np.ones(len(feedback.lexicon.answers), dtype=bool)
+        self.count = len(self.mask)
+        self.guesses = 0 # number of guesses taken into account
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, word):
+        column = self.feedback.lexicon.answers.index(word)
+        return column != -1 and bool(self.mask[column])
+
+    def __iter__(self):
+        for column in np.flatnonzero(self.mask):
+            yield self.feedback.lexicon.answers[column]
+
+    def columns(self):
+        """ Returns the indexes of the remaining answers. """
+        return np.flatnonzero(self.mask)
+
+    def narrow(self, guess, pattern):
+        """ Removes the remaining answers that would not have given pattern
+        for guess. Only the remaining answers are looked at. """
+        columns = np.flatnonzero(self.mask)
+        row = self.feedback.lexicon.valid.index(guess)
+        if self.feedback.ready and row != -1:
+            patterns = self.feedback.matrix[row, columns]
+        else:
+            patterns = score(letters(guess), self.feedback.answer_letters[columns])
+        self.mask[columns[patterns != pattern]] = False
+        self.count = int(np.count_nonzero(patterns == pattern))
+        self.guesses += 1
+
+    def copy(self):
+        """ Returns an independent copy, safe to hand to another thread. """
+        other = CandidateSet.__new__(CandidateSet)
+        other.feedback = self.feedback
+        other.mask = self.mask.copy()
+        other.count = self.count
+        other.guesses = self.guesses
+        return other
+
+############### Typing ###############
+
+# Handles the letters typed by the player and checks the guesses,
+# without drawing anything so it also runs in the simulator
+class Typing:
+    def __init__(self, lexicon, feedback):
+        self.lexicon = lexicon
+        self.feedback = feedback
+        # The board has one more round than the number of letters
+        self.length = lexicon.length
+        self.rounds = self.length + 1
+        self.current_slot = 0
+        self.generate_word()
+        # Answers still possible after the guesses already validated
+        self.candidates = CandidateSet(feedback)
+        self.guess = [[] for _ in range(self.rounds)]
+        self.state = [[None] * self.length for _ in range(self.rounds)]
+    
+    def generate_word(self):
+        self.word = self.lexicon.random_answer()
+    
+    def check_word(self, round):
+        # The feedback table handles repeated letters: a letter is only
+        # marked yellow as many times as it is left unmatched in the word
+        pattern = self.feedback.pattern(''.join(self.guess[round]), self.word)
+        self.state[round] = decode(pattern, self.length)
+        self.candidates.narrow(''.join(self.guess[round]), pattern)
+    
+    def enter_letter(self, letter, round):
+        if self.current_slot < self.length:
+            self.guess[round].append(letter)
+            self.current_slot += 1
+
+    def remove_letter(self, round):
+        if len(self.guess[round]) >= 1:
+            self.guess[round].pop()
+            self.current_slot -= 1
+
+    def validate(self, round):
+        if self.current_slot == self.length: 
+            if self.lexicon.contains(''.join(self.guess[round])):
+                self.check_word(round)
+                self.current_slot = 0
+                return True
+            else:
+                return 'Invalid'
+        return False
+
+############### Hints ###############
+
+# Ranks the guesses by expected information (entropy of the feedback pattern
+# over the answers that are still possible). The ranking runs in a worker
+# thread so the game loop never waits for it. Singleton so the ranking of
+# the first guess is only computed once per process.
+class HintEngine:
+    _instances = {}
+
+    def __new__(cls, feedback=None, count=3):
+        feedback = feedback if feedback is not None else FeedbackTable()
+        if feedback not in cls._instances:
+            cls._instances[feedback] = super().__new__(cls)
+        return cls._instances[feedback]
+
+    def __init__(self, feedback=None, count=3):
+        if getattr(self, 'feedback', None) is not None:
+            return
+        self.feedback = feedback if feedback is not None else FeedbackTable()
+        self.count = count # number of suggestions returned
+        self.first_guess = None # cached ranking when nothing was guessed yet
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def request(self, candidates):
+        """ Starts ranking the words for the remaining candidates (a
+        CandidateSet) in the worker thread. Returns a Future whose result is
+        the list of suggested words. """
+        return self.executor.submit(self.suggest, candidates.copy())
+
+    def suggest(self, candidates):
+        """ Returns the best guesses to play next. """
+        valid = self.feedback.lexicon.valid
+        if candidates.guesses == 0:
+            # The first guess does not depend on the game, it is ranked once
+            # and kept in the cache
+            if self.first_guess is None:
+                rows = self.feedback.lexicon.cache.load(f'first_guess_{self.count}', lambda: self.best(candidates.mask))
+                self.first_guess = [valid[row] for row in rows]
+            return self.first_guess
+        return [valid[row] for row in self.best(candidates.mask)]
+
+    def best(self, mask):
+        """ Returns the rows (indexes in the valid words) of the guesses
+        giving the most information about the answers selected by mask.
+        Answers that are still possible win the ties. """
+        columns = np.flatnonzero(mask)
+        total = len(columns)
+        # With one or two answers left the best move is to play one of them
+        if total <= 2:
+            return self.feedback.answer_rows[columns]
+
+        # Sorting the patterns of each guess puts the answers giving the same
+        # pattern next to each other, the size of each run is then found with
+        # the index of its first and last element
+        patterns = np.sort(self.feedback.matrix[:, columns], axis=1)
+        first = np.ones(patterns.shape, dtype=bool)
+        first[:, 1:] = patterns[:, 1:] != patterns[:, :-1]
+        last = np.ones(patterns.shape, dtype=bool)
+        last[:, :-1] = first[:, 1:]
+        index = np.arange(total)
+        start = np.maximum.accumulate(np.where(first, index, 0), axis=1)
+        end = np.minimum.accumulate(np.where(last, index, total)[:, ::-1], axis=1)[:, ::-1]
+
+        # Entropy = log2(total) - sum(c * log2(c)) / total where c are the run
+        # sizes, each element of a run of size c adds log2(c) to the sum
+        entropy = np.log2(total) - np.log2(end - start + 1).sum(axis=1) / total
+
+        # Marking the guesses that could be the answer
+        possible = np.zeros(len(patterns), dtype=bool)
+        possible[self.feedback.answer_rows[columns]] = True
+
+        return np.lexsort((~possible, -entropy))[:self.count]
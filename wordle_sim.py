@@ -0,0 +1,129 @@
+"""
+Wordle simulator - plays complete Wordle games without any display.
+Description: Every game goes through the same Typing object as the real game
+(letters entered one by one, validation, check_word) so the results match
+what a player would get. Games are spread over a process pool.
+
+Usage: python wordle_sim.py --games 5000 --policy entropy
+"""
+
+import argparse
+import os
+import random
+import time
+from collections import Counter
+from multiprocessing import Pool
+
+import numpy as np
+
+from wordle_engine import Lexicon, FeedbackTable, HintEngine, CandidateSet, Typing, WORD_LENGTH
+
+# Folder of the dictionaries, next to this file whatever the current
+# directory is (like the game)
+dico_path = os.path.dirname(os.path.abspath(__file__))
+
+# Guess policies, they all choose the next guess from the answers that are
+# still possible (the CandidateSet kept up to date by Typing)
+class GuessPolicy:
+    def __init__(self, feedback):
+        self.feedback = feedback
+        self.hints = HintEngine(feedback)
+
+    def choose(self, candidates):
+        pass
+
+class RandomPolicy(GuessPolicy):
+    """ Plays any answer that is still possible. """
+    def choose(self, candidates):
+        columns = candidates.columns()
+        return self.feedback.lexicon.answers[int(random.choice(columns))]
+
+class FrequencyPolicy(GuessPolicy):
+    """ Plays the possible answer whose letters are the most common at their
+    position among the possible answers. """
+    def choose(self, candidates):
+        columns = candidates.columns()
+        words = self.feedback.answer_letters[columns]
+        score = np.zeros(len(words))
+        for i in range(words.shape[1]):
+            counts = np.bincount(words[:, i], minlength=256)
+            score += counts[words[:, i]]
+        return self.feedback.lexicon.answers[int(columns[np.argmax(score)])]
+
+class EntropyPolicy(GuessPolicy):
+    """ Plays the hint engine's best suggestion. """
+    def choose(self, candidates):
+        return self.hints.suggest(candidates)[0]
+
+policies = {'random': RandomPolicy, 'frequency': FrequencyPolicy, 'entropy': EntropyPolicy}
+
+def play(policy):
+    """ Plays one game and returns the number of rounds it took to find the
+    word or None if it was not found. """
+    typing = Typing(policy.feedback.lexicon, policy.feedback)
+    for round in range(len(typing.guess)):
+        guess = policy.choose(typing.candidates)
+        for letter in guess:
+            typing.enter_letter(letter, round)
+        if typing.validate(round) is not True:
+            raise ValueError(f'The policy played an invalid word: {guess}')
+        if all(state == 2 for state in typing.state[round]):
+            return round + 1
+    return None
+
+def play_batch(args):
+    """ Plays a batch of games in a worker process. The seed makes the batch
+    reproducible whatever worker runs it. Returns a Counter of the results. """
+    policy_name, length, games, seed = args
+    random.seed(seed)
+    policy = policies[policy_name](FeedbackTable(Lexicon(length, dico_path)))
+    return Counter(play(policy) for _ in range(games))
+
+def simulate(games, policy_name, length=WORD_LENGTH, workers=None, seed=0, batch=100):
+    """ Plays the games over a process pool and returns the Counter of the
+    results with the time it took. """
+    batches = [(policy_name, length, min(batch, games - start), seed + i)
+               for i, start in enumerate(range(0, games, batch))]
+    # Loading everything before creating the pool: forked workers share it
+    # and the others load it once in the initializer
+    warm_up(policy_name, length)
+    results = Counter()
+    start = time.perf_counter()
+    with Pool(workers, initializer=warm_up, initargs=(policy_name, length)) as pool:
+        for counter in pool.imap_unordered(play_batch, batches):
+            results += counter
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def warm_up(policy_name, length):
+    """ Loads the lexicon, the feedback matrix and the policy's first guess. """
+    feedback = FeedbackTable(Lexicon(length, dico_path))
+    policies[policy_name](feedback).choose(CandidateSet(feedback))
+
+def report(results, elapsed, rounds=6):
+    games = sum(results.values())
+    print(f'{games} games in {elapsed:.2f}s ({games / elapsed:.1f} games/s)')
+    for round in range(1, rounds + 1):
+        count = results[round]
+        print(f'  solved in {round}: {count:6d}  {count / games:6.1%}')
+    failed = results[None]
+    print(f'  not solved in {rounds}: {failed:6d}  {failed / games:6.1%}')
+    solved = games - failed
+    if solved:
+        average = sum(round * count for round, count in results.items() if round is not None) / solved
+        print(f'  average rounds when solved: {average:.3f}')
+
+def main():
+    parser = argparse.ArgumentParser(description='Plays Wordle games without a display.')
+    parser.add_argument('--games', type=int, default=1000, help='number of games to play')
+    parser.add_argument('--policy', choices=sorted(policies), default='entropy', help='guess policy')
+    parser.add_argument('--length', type=int, choices=Lexicon.lengths(dico_path), default=WORD_LENGTH, help='length of the words')
+    parser.add_argument('--workers', type=int, default=None, help='number of processes (default: one per CPU)')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first batch of games')
+    args = parser.parse_args()
+
+    results, elapsed = simulate(args.games, args.policy, args.length, args.workers, args.seed)
+    report(results, elapsed, args.length + 1)
+
+if __name__ == '__main__':
+    main()